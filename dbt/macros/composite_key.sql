@@ -0,0 +1,3 @@
+{% macro composite_key(email_column='email', phone_column='phone_number') %}
+coalesce({{ email_column }}, '') || '|' || coalesce({{ phone_column }}, '')
+{% endmacro %}
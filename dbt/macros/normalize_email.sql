@@ -1,8 +1,7 @@
 {% macro normalize_email(column_name) %}
+-- null and '' never match the pattern, so one LIKE test covers all three checks
 case
-    when {{ column_name }} is not null and {{ column_name }} != ''
-         and {{ column_name }} like '%@%.%'
+    when {{ column_name }} like '%@%.%'
     then lower(trim({{ column_name }}))
-    else null
 end
 {% endmacro %}
@@ -1,37 +1,12 @@
 {% macro normalize_phone_number(column_name) %}
-case
-    when {{ column_name }} is null or trim({{ column_name }}) = '' then null
-    else
-        case
-            when length(
-                case
-                    -- Remove +62 prefix
-                    when regexp_replace({{ column_name }}, '[^0-9+]', '', 'g') like '+62%'
-                    then substring(regexp_replace({{ column_name }}, '[^0-9]', '', 'g') from 3)
-                    -- Remove 62 prefix
-                    when regexp_replace({{ column_name }}, '[^0-9]', '', 'g') like '62%'
-                    then substring(regexp_replace({{ column_name }}, '[^0-9]', '', 'g') from 3)
-                    -- Remove leading 0
-                    when regexp_replace({{ column_name }}, '[^0-9]', '', 'g') like '0%'
-                    then substring(regexp_replace({{ column_name }}, '[^0-9]', '', 'g') from 2)
-                    -- Already clean
-                    else regexp_replace({{ column_name }}, '[^0-9]', '', 'g')
-                end
-            ) >= 9 then '+62' ||
-                case
-                    -- Remove +62 prefix
-                    when regexp_replace({{ column_name }}, '[^0-9+]', '', 'g') like '+62%'
-                    then substring(regexp_replace({{ column_name }}, '[^0-9]', '', 'g') from 3)
-                    -- Remove 62 prefix
-                    when regexp_replace({{ column_name }}, '[^0-9]', '', 'g') like '62%'
-                    then substring(regexp_replace({{ column_name }}, '[^0-9]', '', 'g') from 3)
-                    -- Remove leading 0
-                    when regexp_replace({{ column_name }}, '[^0-9]', '', 'g') like '0%'
-                    then substring(regexp_replace({{ column_name }}, '[^0-9]', '', 'g') from 2)
-                    -- Already clean
-                    else regexp_replace({{ column_name }}, '[^0-9]', '', 'g')
-                end
-            else null
-        end
-end
+-- Strip every non-digit once, then drop a leading 62 (also covers +62) or 0.
+-- substring(... from '^[0-9]{9,}$') yields null when fewer than 9 digits remain,
+-- and '+62' || null is null, so blanks and short numbers fall out as null.
+'+62' || substring(
+    regexp_replace(
+        regexp_replace({{ column_name }}, '[^0-9]', '', 'g'),
+        '^(62|0)', ''
+    )
+    from '^[0-9]{9,}$'
+)
 {% endmacro %}
@@ -10,22 +10,14 @@ Unified contact mart - one row per email-phone pair.
 Integrates data from marketing leads, purchases, and Eduqat.
 */
 
-with marketing_leads as (
-    select
-        *,
-        row_number() over (
-            partition by
-                coalesce(email, ''),
-                coalesce(phone_number, '')
-            order by extracted_at desc
-        ) as row_num
+-- Deduplicated marketing leads (most recent per email-phone)
+-- DISTINCT ON treats nulls as equal, so no coalesce() is needed per row
+with marketing_deduped as (
+    select distinct on (email, phone_number)
+        *
     from {{ ref('int_all_marketing_leads') }}
     where email is not null or phone_number is not null
-),
-
--- Deduplicated marketing leads (most recent per email-phone)
-marketing_deduped as (
-    select * from marketing_leads where row_num = 1
+    order by email, phone_number, extracted_at desc
 ),
 
 -- Purchase data aggregated per email
@@ -32,5 +32,5 @@ with source as (
 
 select
     *,
-    coalesce(email, '') || '|' || coalesce(phone_number, '') as composite_key
+    {{ composite_key() }} as composite_key
 from source
@@ -37,19 +37,18 @@ normalized as (
 with_composite_key as (
     select
         *,
-        -- Create composite key for deduplication
-        coalesce(email, '') || '|' || coalesce(phone_number, '') as composite_key
+        -- Composite key for downstream consumers
+        {{ composite_key() }} as composite_key
     from normalized
 ),
 
+-- Keep the most recent row per email-phone pair. DISTINCT ON treats nulls as
+-- equal, so this groups exactly like composite_key without hashing the string
 deduplicated as (
-    select
-        *,
-        row_number() over (
-            partition by composite_key
-            order by timestamp desc nulls last, extracted_at desc
-        ) as row_num
+    select distinct on (email, phone_number)
+        *
     from with_composite_key
+    order by email, phone_number, timestamp desc nulls last, extracted_at desc
 )
 
 select
@@ -74,4 +73,3 @@ select
     extracted_at,
     composite_key
 from deduplicated
-where row_num = 1
@@ -2,6 +2,13 @@
 Client libraries and utilities for data ingestion.
 """
 
+import pandas as pd
+
+# Copy-on-Write lets the clients take cheap shallow copies of caller DataFrames
+# instead of deep copies. It is always on (and the option deprecated) in pandas 3.
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.options.mode.copy_on_write = True
+
 from .postgres_client import PostgresClient
 from .gsheets_client import GSheetsClient
 
@@ -5,13 +5,19 @@ This module defines the global column mappings that handle common variations
 across all data sources.
 """
 
-from typing import Dict, Any
+import re
+from types import MappingProxyType
+from typing import Iterable, List, Mapping, Any
 import pandas as pd
 
+# Any run of characters outside [a-z0-9] (spaces, punctuation, repeated
+# underscores) collapses to a single underscore
+_NON_ALNUM_RUN_RE = re.compile(r'[^a-z0-9]+')
+
 
 # Global column mapping - handles common variations across all sources
 # NOTE: Keys must match the NORMALIZED column names (lowercase, underscores, no special chars)
-GLOBAL_COLUMN_MAPPING = {
+_GLOBAL_COLUMN_MAPPING = {
     # Phone number fields
     'phone_number': 'phone_number',
     'no_hp_telp': 'phone_number',
@@ -73,8 +79,37 @@ GLOBAL_COLUMN_MAPPING = {
     'paid_at': 'paid_at',
 }
 
+# Read-only view so callers can't mutate the shared mapping at runtime
+GLOBAL_COLUMN_MAPPING = MappingProxyType(_GLOBAL_COLUMN_MAPPING)
+
+
+def normalize_column_name(name: str) -> str:
+    """
+    Normalize a raw header to the form used as GLOBAL_COLUMN_MAPPING keys.
+
+    Args:
+        name: Raw column header, e.g. "No. HP/Telp"
+
+    Returns:
+        Lowercase snake_case name, e.g. "no_hp_telp"
+    """
+    return _NON_ALNUM_RUN_RE.sub('_', str(name).lower()).strip('_')
+
+
+def normalize_column_names(columns: Iterable[str]) -> List[str]:
+    """
+    Normalize a sequence of raw headers with normalize_column_name.
+
+    Args:
+        columns: Raw column headers
+
+    Returns:
+        List of normalized column names, in the same order
+    """
+    return [normalize_column_name(col) for col in columns]
+
 
-def apply_column_mapping(df: pd.DataFrame, mapping: Dict[str, str] = None) -> pd.DataFrame:
+def apply_column_mapping(df: pd.DataFrame, mapping: Mapping[str, str] = None) -> pd.DataFrame:
     """
     Apply column mapping to a DataFrame.
 
@@ -86,20 +121,22 @@ def apply_column_mapping(df: pd.DataFrame, mapping: Dict[str, str] = None) -> pd
         DataFrame with renamed columns
     """
     if mapping is None:
-        mapping = GLOBAL_COLUMN_MAPPING
+        # Look up in the plain dict directly; the proxy only guards the public name
+        mapping = _GLOBAL_COLUMN_MAPPING
 
     # Only rename columns that exist in the DataFrame
-    # and don't cause duplicates (target column doesn't already exist)
+    # and don't cause duplicates (target column doesn't already exist).
+    # Walk the DataFrame's columns (usually far fewer than the mapping keys)
+    # and look each one up in the mapping dict.
     rename_dict = {}
-    existing_cols = set(df.columns)
-    target_cols = set()  # Track what we're renaming TO
-
-    for k, v in mapping.items():
-        if k in existing_cols:
-            # Only rename if target doesn't already exist and we haven't already mapped to it
-            if v not in existing_cols and v not in target_cols:
-                rename_dict[k] = v
-                target_cols.add(v)
+    seen_targets = set(df.columns)  # Existing columns plus what we're renaming TO
+
+    for col in df.columns:
+        target = mapping.get(col)
+        # Only rename if target doesn't already exist and we haven't already mapped to it
+        if target is not None and target not in seen_targets:
+            rename_dict[col] = target
+            seen_targets.add(target)
 
     if rename_dict:
         df = df.rename(columns=rename_dict)
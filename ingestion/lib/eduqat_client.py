@@ -6,12 +6,35 @@ Provides methods to interact with the Eduqat public API.
 
 import os
 import json
-import urllib.request
-import urllib.parse
-import urllib.error
-from typing import Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterator, Optional
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
 
+try:
+    import orjson
+except ImportError:  # speedup only; fall back to the stdlib json
+    orjson = None
+
+# env files already loaded by load_dotenv in this process
+_ENV_LOADED: set[str] = set()
+
+
+def _loads(data: bytes) -> Any:
+    """Decode a JSON body straight from bytes, using orjson when installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _dumps(obj: Any) -> bytes:
+    """Encode a request body to JSON bytes, using orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode('utf-8')
+
 
 class EduqatApiError(Exception):
     """Exception raised for Eduqat API errors."""
@@ -24,6 +47,9 @@ class EduqatApiError(Exception):
 class EduqatClient:
     """Client for interacting with the Eduqat public API."""
 
+    # (connect, read) timeout in seconds for every request
+    REQUEST_TIMEOUT = (5, 30)
+
     def __init__(self, api_key: Optional[str] = None, env_file: str = '.env.local'):
         """
         Initialize the Eduqat client.
@@ -32,8 +58,10 @@ class EduqatClient:
             api_key: Optional API key. If not provided, reads from EDUQAT_API_KEY env var.
             env_file: Path to env file to load (default: .env.local)
         """
-        # Load environment variables
-        load_dotenv(env_file)
+        # Load environment variables (once per env file per process)
+        if env_file not in _ENV_LOADED:
+            load_dotenv(env_file)
+            _ENV_LOADED.add(env_file)
 
         self.api_key = api_key or os.getenv('EDUQAT_API_KEY')
         if not self.api_key:
@@ -41,6 +69,39 @@ class EduqatClient:
 
         self.base_url = 'https://public-api.eduqat.com'
 
+        # One session for the lifetime of the client so paginated and follow-up
+        # requests reuse the same keep-alive TCP/TLS connection
+        self._session = requests.Session()
+        self._session.headers.update({
+            'Content-Type': 'application/json',
+            'x-api-key': self.api_key,
+            'User-Agent': 'umkmall-analytics/1.0',
+        })
+
+        # Retry rate limits and gateway errors with backoff. Idempotent methods
+        # only (urllib3's default), and the last response is returned rather than
+        # raised so it gets the usual EduqatApiError handling below.
+        retry = Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=[429, 502, 503, 504],
+            raise_on_status=False,
+        )
+        # pool_maxsize covers get_many's default worker count with headroom
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry)
+        self._session.mount('https://', adapter)
+        self._session.mount('http://', adapter)
+
+    def close(self) -> None:
+        """Close the underlying session and its pooled connections."""
+        self._session.close()
+
+    def __enter__(self) -> 'EduqatClient':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
     def _make_request(
         self,
         endpoint: str,
@@ -65,39 +126,117 @@ class EduqatClient:
         """
         url = f'{self.base_url}{endpoint}'
 
-        # Add query parameters if provided
-        if params:
-            query_string = urllib.parse.urlencode(params)
-            url = f'{url}?{query_string}'
-
-        headers = {
-            'Content-Type': 'application/json',
-            'x-api-key': self.api_key,
-            'User-Agent': 'umkmall-analytics/1.0',
-        }
-
-        data = None
-        if body:
-            data = json.dumps(body).encode('utf-8')
+        try:
+            response = self._session.request(
+                method,
+                url,
+                params=params or None,
+                data=_dumps(body) if body else None,
+                timeout=self.REQUEST_TIMEOUT,
+            )
+        except requests.Timeout as e:
+            raise EduqatApiError(f'Timeout: {e}')
+        except requests.ConnectionError as e:
+            raise EduqatApiError(f'URL Error: {e}')
+        except requests.RequestException as e:
+            raise EduqatApiError(f'Unexpected error: {str(e)}')
 
-        req = urllib.request.Request(url, data=data, headers=headers, method=method)
+        if not response.ok:
+            message = f'HTTP {response.status_code}: {response.reason}'
+            try:
+                error_data = _loads(response.content)
+                if isinstance(error_data, dict):
+                    message = error_data.get('message', message)
+            except ValueError:
+                pass
+            raise EduqatApiError(message, status_code=response.status_code)
 
         try:
-            with urllib.request.urlopen(req) as response:
-                return json.loads(response.read().decode('utf-8'))
-        except urllib.error.HTTPError as e:
-            error_body = e.read().decode('utf-8')
-            try:
-                error_data = json.loads(error_body)
-                message = error_data.get('message', f'HTTP {e.code}: {e.reason}')
-            except json.JSONDecodeError:
-                message = f'HTTP {e.code}: {e.reason}'
-            raise EduqatApiError(message, status_code=e.code)
-        except urllib.error.URLError as e:
-            raise EduqatApiError(f'URL Error: {e.reason}')
-        except Exception as e:
+            return _loads(response.content)
+        except ValueError as e:
             raise EduqatApiError(f'Unexpected error: {str(e)}')
 
+    def _iter_pages(self, endpoint: str, items_key: str = 'items', page_limit: int = 100):
+        """
+        Yield items from every page of a paginated endpoint.
+
+        Pages are requested in order until one comes back short, the API's
+        'count' total has been reached, or a page repeats the previous one.
+
+        If the server caps page 1 below page_limit while its 'count' says more
+        items exist, the capped size becomes the short-page threshold, so a
+        server-side cap (e.g. 25 users per page) doesn't end pagination early.
+
+        Args:
+            endpoint: API endpoint path
+            items_key: Response key holding the page's items
+            page_limit: Number of items to request per page
+
+        Yields:
+            Individual items, in page order
+        """
+        params = {'page': 1, 'limit': page_limit}
+        effective_limit = page_limit
+        total = None
+        fetched = 0
+        previous_items = None
+
+        while True:
+            response = self._make_request(endpoint, params=params)
+            items = response.get(items_key) or []
+
+            # Some endpoints ignore the page parameter and return the same
+            # items every time; stop instead of yielding duplicates forever
+            if items and items == previous_items:
+                return
+
+            yield from items
+            fetched += len(items)
+
+            if params['page'] == 1:
+                count = response.get('count')
+                total = count if isinstance(count, int) else None
+                if items and len(items) < page_limit and total is not None and total > len(items):
+                    effective_limit = len(items)
+
+            # If we got fewer items than the limit, we've reached the last page
+            if len(items) < effective_limit or (total is not None and fetched >= total):
+                return
+
+            previous_items = items
+            params['page'] += 1
+
+    def _get_items(self, endpoint: str, page: Optional[int], limit: Optional[int]) -> dict:
+        """
+        Fetch one page, or every page when neither page nor limit is given.
+
+        Args:
+            endpoint: API endpoint path
+            page: Optional specific page to fetch (1-indexed)
+            limit: Optional number of items per page
+
+        Returns:
+            Dict with 'count' and 'items' keys. 'count' is the number of items
+            actually fetched, not the API's count field.
+        """
+        # If specific page/limit requested, return single page
+        if page is not None or limit is not None:
+            params = {}
+            if page is not None:
+                params['page'] = page
+            if limit is not None:
+                params['limit'] = limit
+            response = self._make_request(endpoint, params=params)
+            items = response.get('items') or []
+        else:
+            # Use a larger page size for efficiency
+            items = list(self._iter_pages(endpoint, page_limit=100))
+
+        return {
+            'count': len(items),
+            'items': items
+        }
+
     def get_enrollments(self, page: Optional[int] = None, limit: Optional[int] = None) -> dict:
         """
         Get all enrollments from /manage/admin/enrollments.
@@ -138,42 +277,22 @@ class EduqatClient:
                 ]
             }
         """
-        # If specific page/limit requested, return single page
-        if page is not None or limit is not None:
-            params = {}
-            if page is not None:
-                params['page'] = page
-            if limit is not None:
-                params['limit'] = limit
-            response = self._make_request('/manage/admin/enrollments', params=params)
-            # Return actual count based on items fetched, not API's count field
-            return {
-                'count': len(response.get('items', [])),
-                'items': response.get('items', [])
-            }
+        return self._get_items('/manage/admin/enrollments', page, limit)
 
-        # Otherwise, fetch all pages automatically
-        all_items = []
-        page = 1
-        page_limit = 100  # Use a larger page size for efficiency
-
-        while True:
-            params = {'page': page, 'limit': page_limit}
-            response = self._make_request('/manage/admin/enrollments', params=params)
-
-            items = response.get('items', [])
-            all_items.extend(items)
+    def iter_enrollments(self, page_limit: int = 100) -> Iterator[dict]:
+        """
+        Yield every enrollment from /manage/admin/enrollments, one at a time.
 
-            # If we got fewer items than the limit, we've reached the last page
-            if len(items) < page_limit:
-                break
+        Pages are fetched as the iterator is consumed, so only one page is
+        held in memory. Pagination works as in get_enrollments.
 
-            page += 1
+        Args:
+            page_limit: Number of items to request per page
 
-        return {
-            'count': len(all_items),
-            'items': all_items
-        }
+        Yields:
+            Enrollment dicts, in page order
+        """
+        return self._iter_pages('/manage/admin/enrollments', page_limit=page_limit)
 
     def get_users(self, page: Optional[int] = None, limit: Optional[int] = None) -> dict:
         """
@@ -216,42 +335,7 @@ class EduqatClient:
                 ]
             }
         """
-        # If specific page/limit requested, return single page
-        if page is not None or limit is not None:
-            params = {}
-            if page is not None:
-                params['page'] = page
-            if limit is not None:
-                params['limit'] = limit
-            response = self._make_request('/manage/admin/users', params=params)
-            # Return actual count based on items fetched, not API's count field
-            return {
-                'count': len(response.get('items', [])),
-                'items': response.get('items', [])
-            }
-
-        # Otherwise, fetch all pages automatically
-        all_items = []
-        page = 1
-        page_limit = 100  # Use a larger page size for efficiency
-
-        while True:
-            params = {'page': page, 'limit': page_limit}
-            response = self._make_request('/manage/admin/users', params=params)
-
-            items = response.get('items', [])
-            all_items.extend(items)
-
-            # If we got fewer items than the limit, we've reached the last page
-            if len(items) < page_limit:
-                break
-
-            page += 1
-
-        return {
-            'count': len(all_items),
-            'items': all_items
-        }
+        return self._get_items('/manage/admin/users', page, limit)
 
     def get_courses(self, page: Optional[int] = None, limit: Optional[int] = None) -> dict:
         """
@@ -283,42 +367,7 @@ class EduqatClient:
                 ]
             }
         """
-        # If specific page/limit requested, return single page
-        if page is not None or limit is not None:
-            params = {}
-            if page is not None:
-                params['page'] = page
-            if limit is not None:
-                params['limit'] = limit
-            response = self._make_request('/manage/admin/courses', params=params)
-            # Return actual count based on items fetched, not API's count field
-            return {
-                'count': len(response.get('items', [])),
-                'items': response.get('items', [])
-            }
-
-        # Otherwise, fetch all pages automatically
-        all_items = []
-        page = 1
-        page_limit = 100  # Use a larger page size for efficiency
-
-        while True:
-            params = {'page': page, 'limit': page_limit}
-            response = self._make_request('/manage/admin/courses', params=params)
-
-            items = response.get('items', [])
-            all_items.extend(items)
-
-            # If we got fewer items than the limit, we've reached the last page
-            if len(items) < page_limit:
-                break
-
-            page += 1
-
-        return {
-            'count': len(all_items),
-            'items': all_items
-        }
+        return self._get_items('/manage/admin/courses', page, limit)
 
     def get(self, endpoint: str) -> dict:
         """
@@ -332,6 +381,44 @@ class EduqatClient:
         """
         return self._make_request(endpoint, method='GET')
 
+    def get_many(
+        self,
+        endpoints: list[str],
+        max_workers: int = 8,
+        return_exceptions: bool = False
+    ) -> list:
+        """
+        Make GET requests to several endpoints concurrently.
+
+        Requests run on a thread pool sharing the client's session, so they
+        overlap their network wait instead of running one after another.
+
+        Args:
+            endpoints: API endpoint paths
+            max_workers: Maximum number of requests in flight at once
+            return_exceptions: If True, a failed request puts its EduqatApiError
+                in the result list instead of raising it
+
+        Returns:
+            Parsed JSON responses, in the same order as endpoints
+
+        Raises:
+            EduqatApiError: If a request fails and return_exceptions is False
+        """
+        def fetch(endpoint: str) -> Any:
+            try:
+                return self._make_request(endpoint, method='GET')
+            except EduqatApiError as e:
+                if return_exceptions:
+                    return e
+                raise
+
+        if not endpoints:
+            return []
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(endpoints))) as executor:
+            return list(executor.map(fetch, endpoints))
+
     def post(self, endpoint: str, body: dict) -> dict:
         """
         Make a POST request to any endpoint.
@@ -345,15 +432,23 @@ class EduqatClient:
         """
         return self._make_request(endpoint, method='POST', body=body)
 
-    def get_ai_conversations(self, page: Optional[int] = None, limit: Optional[int] = None) -> dict:
+    def get_ai_conversations(
+        self,
+        page: Optional[int] = None,
+        limit: Optional[int] = None,
+        max_workers: int = 8
+    ) -> dict:
         """
         Get all AI submission conversations from /ai/api/ext/submission-conversations.
 
-        Automatically fetches all pages if page/limit are not provided.
+        Automatically fetches all pages if page/limit are not provided. Page 1
+        is fetched first to read meta.total_pages; the remaining pages are then
+        fetched concurrently.
 
         Args:
             page: Optional specific page to fetch (1-indexed)
             limit: Optional number of items per page
+            max_workers: Maximum number of page requests in flight at once
 
         Returns:
             Dict with 'count' and 'items' keys containing conversation data.
@@ -399,7 +494,7 @@ class EduqatClient:
             if limit is not None:
                 params['limit'] = limit
             response = self._make_request(endpoint, params=params)
-            data = response.get('data', [])
+            data = response.get('data') or []
             return {
                 'count': len(data),
                 'items': data,
@@ -407,31 +502,54 @@ class EduqatClient:
             }
 
         # Otherwise, fetch all pages automatically
-        all_items = []
-        page = 1
-        page_limit = 100  # Use a larger page size for efficiency
+        all_items = [
+            item
+            for data in self.iter_ai_conversation_pages(max_workers=max_workers)
+            for item in data
+        ]
 
-        while True:
-            params = {'page': page, 'limit': page_limit}
-            response = self._make_request(endpoint, params=params)
+        return {
+            'count': len(all_items),
+            'items': all_items
+        }
 
-            data = response.get('data', [])
-            all_items.extend(data)
+    def iter_ai_conversation_pages(
+        self,
+        page_limit: int = 100,
+        max_workers: int = 8
+    ) -> Iterator[list]:
+        """
+        Yield every page of AI submission conversations, in page order.
 
-            # Check meta for total pages
-            meta = response.get('meta', {})
-            total_pages = meta.get('total_pages', 1)
+        Page 1 is fetched first to read meta.total_pages; the remaining pages
+        are fetched concurrently, max_workers at a time, as the iterator is
+        consumed. At most max_workers pages are held in memory.
 
-            # If we've fetched all pages, stop
-            if page >= total_pages:
-                break
+        Args:
+            page_limit: Number of items to request per page
+            max_workers: Maximum number of page requests in flight at once
 
-            page += 1
+        Yields:
+            Lists of conversation dicts, one per page
+        """
+        endpoint = '/ai/api/ext/submission-conversations'
 
-        return {
-            'count': len(all_items),
-            'items': all_items
-        }
+        def fetch_page(page_number: int) -> list:
+            params = {'page': page_number, 'limit': page_limit}
+            return self._make_request(endpoint, params=params).get('data') or []
+
+        # The first page tells us how many pages there are
+        response = self._make_request(endpoint, params={'page': 1, 'limit': page_limit})
+        yield response.get('data') or []
+        total_pages = response.get('meta', {}).get('total_pages', 1)
+
+        # Fetch the remaining pages concurrently in windows of max_workers;
+        # map() keeps them in page order
+        if total_pages > 1:
+            with ThreadPoolExecutor(max_workers=min(max_workers, total_pages - 1)) as executor:
+                for start in range(2, total_pages + 1, max_workers):
+                    window = range(start, min(start + max_workers, total_pages + 1))
+                    yield from executor.map(fetch_page, window)
 
     def get_ai_conversation_messages(self, conversation_id: str) -> dict:
         """
@@ -461,5 +579,37 @@ class EduqatClient:
         endpoint = f'/ai/api/ext/submission-conversations/messages/{conversation_id}'
         response = self._make_request(endpoint)
         return {
-            'messages': response.get('data', [])
-        }
\ No newline at end of file
+            'messages': response.get('data') or []
+        }
+
+    def get_ai_conversation_messages_batch(
+        self,
+        conversation_ids: list[str],
+        max_workers: int = 8,
+        return_exceptions: bool = False
+    ) -> dict:
+        """
+        Get messages for several AI conversations concurrently.
+
+        Args:
+            conversation_ids: The conversation_ids (session_ids) to fetch messages for
+            max_workers: Maximum number of requests in flight at once
+            return_exceptions: If True, a failed conversation maps to its
+                EduqatApiError instead of raising it
+
+        Returns:
+            Dict mapping each conversation_id to its list of message objects
+            (or to an EduqatApiError when return_exceptions is True)
+
+        Raises:
+            EduqatApiError: If a request fails and return_exceptions is False
+        """
+        endpoints = [
+            f'/ai/api/ext/submission-conversations/messages/{conversation_id}'
+            for conversation_id in conversation_ids
+        ]
+        responses = self.get_many(endpoints, max_workers=max_workers, return_exceptions=return_exceptions)
+        return {
+            conversation_id: response if isinstance(response, EduqatApiError) else response.get('data') or []
+            for conversation_id, response in zip(conversation_ids, responses)
+        }
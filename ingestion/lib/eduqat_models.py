@@ -10,7 +10,7 @@ from typing import Optional, Any
 from datetime import datetime
 
 
-@dataclass
+@dataclass(slots=True)
 class UserData:
     """User information embedded in enrollment."""
     id: str
@@ -30,7 +30,7 @@ class UserData:
     updated_at: str
 
 
-@dataclass
+@dataclass(slots=True)
 class Certificate:
     """Certificate earned by user for course completion."""
     id: str
@@ -48,7 +48,7 @@ class Certificate:
     updated_at: str
 
 
-@dataclass
+@dataclass(slots=True)
 class SurveySubmission:
     """Survey or quiz submission within a material."""
     submission_id: str
@@ -64,7 +64,7 @@ class SurveySubmission:
     status: Optional[str] = None  # 'failed', 'passed'
 
 
-@dataclass
+@dataclass(slots=True)
 class MaterialCompletion:
     """Completion status for a single material/lesson.
 
@@ -93,14 +93,14 @@ class MaterialCompletion:
     status: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class TrackedTime:
     """Time tracking information."""
     total: float
     last_tracked_at: str
 
 
-@dataclass
+@dataclass(slots=True)
 class LastVisitedMaterial:
     """Information about the last material visited by user."""
     id: int
@@ -113,7 +113,7 @@ class LastVisitedMaterial:
     meta: dict  # Contains material-specific configuration
 
 
-@dataclass
+@dataclass(slots=True)
 class EnrollmentMetadata:
     """Metadata for an enrollment."""
     type: str  # e.g., 'manual'
@@ -135,13 +135,13 @@ class EnrollmentMetadata:
     attendance_percentage: Optional[float] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Completions:
     """Container for material completions."""
     materials: dict[str, MaterialCompletion]  # Key is material ID as string
 
 
-@dataclass
+@dataclass(slots=True)
 class Enrollment:
     """
     Main enrollment object from /manage/admin/enrollments endpoint.
@@ -180,7 +180,7 @@ class Enrollment:
     user_group_admins: list
 
 
-@dataclass
+@dataclass(slots=True)
 class EnrollmentsResponse:
     """Response from /manage/admin/enrollments endpoint."""
     count: int
@@ -200,14 +200,12 @@ def get_first_material_start(enrollment: dict) -> Optional[str]:
     completions = enrollment.get('completions', {})
     materials = completions.get('materials', {})
 
-    start_dates = []
-    for material_id, material in materials.items():
-        if isinstance(material, dict) and material.get('started_at'):
-            start_dates.append(material['started_at'])
-
-    if start_dates:
-        return min(start_dates)
-    return None
+    # ISO-8601 strings in the same format sort chronologically, so no parsing
+    return min(
+        (material['started_at'] for material in materials.values()
+         if isinstance(material, dict) and material.get('started_at')),
+        default=None,
+    )
 
 
 def get_total_tracked_time(enrollment: dict) -> Optional[float]:
@@ -221,7 +219,7 @@ def get_total_tracked_time(enrollment: dict) -> Optional[float]:
 # AI Conversation Models (from /ai/api/ext/submission-conversations)
 # =============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class AIConversationUser:
     """User information embedded in AI conversation."""
     id: str
@@ -233,14 +231,14 @@ class AIConversationUser:
     role: str
 
 
-@dataclass
+@dataclass(slots=True)
 class AIConversationEducator:
     """Educator information embedded in AI conversation (often empty)."""
     created_at: str
     # Other fields may be present when educator is assigned
 
 
-@dataclass
+@dataclass(slots=True)
 class AIConversationMessage:
     """
     A single message in an AI conversation.
@@ -253,7 +251,7 @@ class AIConversationMessage:
     timestamp: str  # ISO timestamp
 
 
-@dataclass
+@dataclass(slots=True)
 class AIConversation:
     """
     AI submission conversation from /ai/api/ext/submission-conversations.
@@ -292,7 +290,7 @@ class AIConversation:
     messages: Optional[list[AIConversationMessage]] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class AIConversationsResponse:
     """
     Response from /ai/api/ext/submission-conversations endpoint.
@@ -306,7 +304,7 @@ class AIConversationsResponse:
     meta: dict  # Contains: total_pages, total_count, page, limit
 
 
-@dataclass
+@dataclass(slots=True)
 class AIConversationMessagesResponse:
     """Response from /ai/api/ext/submission-conversations/messages/{id}."""
     code: int
@@ -1,12 +1,86 @@
 """
 Google Sheets client for accessing and reading sheets data.
 """
+import functools
+import hashlib
 import os
+import random
+import re
+import threading
+import time
 from typing import Optional, List, Dict, Any
+import numpy as np
 import pandas as pd
 from google.oauth2.service_account import Credentials
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
+from googleapiclient.model import JsonModel
+
+try:
+    import orjson
+except ImportError:  # speedup only; fall back to the stdlib json
+    orjson = None
+
+from .column_mappings import normalize_column_names
+
+# Per-thread cache of (credentials, service) keyed on the credentials source.
+# googleapiclient services wrap an httplib2.Http, which is not thread-safe,
+# so threads never share one.
+_thread_local = threading.local()
+
+# Top-left cell of an A1 range, e.g. 'B2' in 'B2:D10'
+_A1_CELL_RE = re.compile(r'([A-Za-z]+)(\d+)')
+
+# HTTP statuses worth retrying: rate limiting and transient server errors
+_RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+class _OrjsonModel(JsonModel):
+    """JsonModel that parses response bodies with orjson when installed."""
+
+    def deserialize(self, content):
+        if orjson is None:
+            return super().deserialize(content)
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
+            # Same fallback as JsonModel for non-JSON bodies
+            return super().deserialize(content)
+
+
+_JSON_MODEL = _OrjsonModel()
+
+
+def _execute(request, max_attempts: int = 6) -> Any:
+    """
+    Execute a Sheets API request, retrying rate limits and server errors.
+
+    Waits for the Retry-After header when the API sends one, otherwise backs
+    off exponentially (1, 2, 4, ... seconds, capped at 64) with jitter.
+
+    Args:
+        request: An un-executed googleapiclient request
+        max_attempts: Total number of attempts before giving up
+
+    Returns:
+        The request's response
+
+    Raises:
+        HttpError: If the error isn't retryable or attempts run out
+    """
+    for attempt in range(max_attempts):
+        try:
+            return request.execute()
+        except HttpError as error:
+            if error.resp.status not in _RETRYABLE_STATUSES or attempt == max_attempts - 1:
+                raise
+            retry_after = error.resp.get('retry-after')
+            if retry_after and retry_after.isdigit():
+                delay = int(retry_after)
+            else:
+                delay = min(64, 2 ** attempt) + random.random()
+            print(f"Sheets API returned {error.resp.status}, retrying in {delay:.1f}s")
+            time.sleep(delay)
 
 
 class GSheetsClient:
@@ -15,6 +89,9 @@ class GSheetsClient:
     # If modifying these scopes, delete the token file
     SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
 
+    # Rows per value range when writing large DataFrames
+    WRITE_CHUNK_ROWS = 10_000
+
     def __init__(self, credentials_path: Optional[str] = None):
         """
         Initialize Google Sheets client.
@@ -29,41 +106,15 @@ class GSheetsClient:
         """
         # Method 1: Direct path provided
         if credentials_path:
-            self.credentials = Credentials.from_service_account_file(
-                credentials_path,
-                scopes=self.SCOPES
-            )
+            key = ('file', credentials_path)
         # Method 2: GOOGLE_APPLICATION_CREDENTIALS env var
-        elif os.getenv('GOOGLE_APPLICATION_CREDENTIALS'):
-            self.credentials = Credentials.from_service_account_file(
-                os.getenv('GOOGLE_APPLICATION_CREDENTIALS'),
-                scopes=self.SCOPES
-            )
+        elif app_credentials := os.getenv('GOOGLE_APPLICATION_CREDENTIALS'):
+            key = ('file', app_credentials)
         # Method 3: Individual env vars (GOOGLE_CLIENT_EMAIL and GOOGLE_PRIVATE_KEY)
-        elif os.getenv('GOOGLE_CLIENT_EMAIL') and os.getenv('GOOGLE_PRIVATE_KEY'):
-            client_email = os.getenv('GOOGLE_CLIENT_EMAIL')
-            private_key = os.getenv('GOOGLE_PRIVATE_KEY')
-
-            # Handle escaped newlines in private key (common in env vars)
-            private_key = private_key.replace('\\n', '\n')
-
-            service_account_info = {
-                "type": "service_account",
-                "project_id": os.getenv('GOOGLE_PROJECT_ID', ''),
-                "private_key_id": os.getenv('GOOGLE_PRIVATE_KEY_ID', ''),
-                "private_key": private_key,
-                "client_email": client_email,
-                "client_id": os.getenv('GOOGLE_CLIENT_ID', ''),
-                "auth_uri": "https://accounts.google.com/o/oauth2/auth",
-                "token_uri": "https://oauth2.googleapis.com/token",
-                "auth_provider_x509_cert_url": "https://www.googleapis.com/oauth2/v1/certs",
-                "client_x509_cert_url": f"https://www.googleapis.com/robot/v1/metadata/x509/{client_email}"
-            }
-
-            self.credentials = Credentials.from_service_account_info(
-                service_account_info,
-                scopes=self.SCOPES
-            )
+        elif ((client_email := os.getenv('GOOGLE_CLIENT_EMAIL'))
+              and (private_key := os.getenv('GOOGLE_PRIVATE_KEY'))):
+            # Key on a digest so the private key isn't kept in cache keys
+            key = ('env', client_email, hashlib.sha256(private_key.encode()).hexdigest())
         else:
             raise ValueError(
                 "No credentials provided. Please either:\n"
@@ -72,7 +123,56 @@ class GSheetsClient:
                 "  3. Set GOOGLE_CLIENT_EMAIL and GOOGLE_PRIVATE_KEY env vars"
             )
 
-        self.service = build('sheets', 'v4', credentials=self.credentials)
+        # Reuse this thread's credentials and service for the same source, so
+        # each sheets ingestion doesn't rebuild the client and re-authenticate
+        services = getattr(_thread_local, 'services', None)
+        if services is None:
+            services = _thread_local.services = {}
+        if key not in services:
+            credentials = self._load_credentials(key)
+            services[key] = (credentials, build('sheets', 'v4', credentials=credentials, model=_JSON_MODEL))
+        self.credentials, self.service = services[key]
+
+    @classmethod
+    @functools.lru_cache(maxsize=4)
+    def _load_credentials(cls, key: tuple) -> Credentials:
+        """
+        Build service account credentials for a key produced by __init__.
+
+        Cached per key for the life of the process, so every thread and
+        client shares one credentials object (and one access token).
+
+        Args:
+            key: ('file', path) or ('env', client_email, private_key_digest)
+
+        Returns:
+            Service account credentials scoped to SCOPES
+        """
+        if key[0] == 'file':
+            return Credentials.from_service_account_file(key[1], scopes=cls.SCOPES)
+
+        _, client_email, _ = key
+
+        # Handle escaped newlines in private key (common in env vars)
+        private_key = os.getenv('GOOGLE_PRIVATE_KEY', '').replace('\\n', '\n')
+
+        service_account_info = {
+            "type": "service_account",
+            "project_id": os.getenv('GOOGLE_PROJECT_ID', ''),
+            "private_key_id": os.getenv('GOOGLE_PRIVATE_KEY_ID', ''),
+            "private_key": private_key,
+            "client_email": client_email,
+            "client_id": os.getenv('GOOGLE_CLIENT_ID', ''),
+            "auth_uri": "https://accounts.google.com/o/oauth2/auth",
+            "token_uri": "https://oauth2.googleapis.com/token",
+            "auth_provider_x509_cert_url": "https://www.googleapis.com/oauth2/v1/certs",
+            "client_x509_cert_url": f"https://www.googleapis.com/robot/v1/metadata/x509/{client_email}"
+        }
+
+        return Credentials.from_service_account_info(
+            service_account_info,
+            scopes=cls.SCOPES
+        )
 
     def read_sheet(
         self,
@@ -94,11 +194,11 @@ class GSheetsClient:
         """
         try:
             sheet = self.service.spreadsheets()
-            result = sheet.values().get(
+            result = _execute(sheet.values().get(
                 spreadsheetId=spreadsheet_id,
                 range=range_name,
                 valueRenderOption=value_render_option
-            ).execute()
+            ))
 
             values = result.get('values', [])
             return values
@@ -111,7 +211,8 @@ class GSheetsClient:
         self,
         spreadsheet_id: str,
         range_name: str,
-        header_row: int = 0
+        header_row: int = 0,
+        value_render_option: str = 'FORMATTED_VALUE'
     ) -> pd.DataFrame:
         """
         Read a Google Sheet directly into a pandas DataFrame.
@@ -120,12 +221,29 @@ class GSheetsClient:
             spreadsheet_id: The ID of the spreadsheet
             range_name: The A1 notation of the range
             header_row: Which row to use as column headers (0-indexed)
+            value_render_option: How values should be represented (see read_sheet).
+                                'UNFORMATTED_VALUE' gives smaller payloads with
+                                numbers, booleans and date serial numbers instead
+                                of display strings
 
         Returns:
             DataFrame with the sheet data
         """
-        values = self.read_sheet(spreadsheet_id, range_name)
+        values = self.read_sheet(spreadsheet_id, range_name, value_render_option)
+        return self._values_to_dataframe(values, header_row)
 
+    @staticmethod
+    def _values_to_dataframe(values: List[List[Any]], header_row: int = 0) -> pd.DataFrame:
+        """
+        Turn raw sheet values into a DataFrame with normalized column names.
+
+        Args:
+            values: Rows as returned by the Sheets values API
+            header_row: Which row to use as column headers (0-indexed)
+
+        Returns:
+            DataFrame with the sheet data
+        """
         if not values:
             return pd.DataFrame()
 
@@ -133,23 +251,19 @@ class GSheetsClient:
         headers = values[header_row]
         data = values[header_row + 1:]
 
-        # Ensure all rows have the same length as headers
+        # Ensure all rows have the same length as headers: start from a grid of
+        # '' and copy each row's cells in, so short rows stay padded and long
+        # rows are truncated without building a padded list per row
         max_cols = len(headers)
-        normalized_data = []
-        for row in data:
-            # Pad rows that are shorter than headers
-            padded_row = row + [''] * (max_cols - len(row))
-            normalized_data.append(padded_row[:max_cols])
-
-        df = pd.DataFrame(normalized_data, columns=headers)
-
-        # Convert column names to lowercase and replace spaces with underscores
-        df.columns = (df.columns
-                      .str.lower()
-                      .str.replace(' ', '_', regex=False)
-                      .str.replace(r'[^a-z0-9_]', '_', regex=True)  # Replace special chars with underscore
-                      .str.replace(r'_+', '_', regex=True)  # Replace multiple underscores with single
-                      .str.strip('_'))  # Remove leading/trailing underscores
+        grid = np.full((len(data), max_cols), '', dtype=object)
+        for i, row in enumerate(data):
+            n = min(len(row), max_cols)
+            grid[i, :n] = row[:n]
+
+        df = pd.DataFrame(grid, columns=headers)
+
+        # Normalize headers to the snake_case keys used by GLOBAL_COLUMN_MAPPING
+        df.columns = normalize_column_names(df.columns)
 
         return df
 
@@ -164,9 +278,9 @@ class GSheetsClient:
             List of sheet metadata dictionaries
         """
         try:
-            sheet_metadata = self.service.spreadsheets().get(
+            sheet_metadata = _execute(self.service.spreadsheets().get(
                 spreadsheetId=spreadsheet_id
-            ).execute()
+            ))
 
             sheets = sheet_metadata.get('sheets', [])
             return [
@@ -187,7 +301,8 @@ class GSheetsClient:
         self,
         spreadsheet_id: str,
         header_row: int = 0,
-        exclude_sheets: Optional[List[str]] = None
+        exclude_sheets: Optional[List[str]] = None,
+        value_render_option: str = 'FORMATTED_VALUE'
     ) -> Dict[str, pd.DataFrame]:
         """
         Read all sheets from a spreadsheet into a dictionary of DataFrames.
@@ -196,6 +311,8 @@ class GSheetsClient:
             spreadsheet_id: The ID of the spreadsheet
             header_row: Which row to use as column headers (0-indexed)
             exclude_sheets: List of sheet names to exclude from reading
+            value_render_option: How values should be represented (see
+                                read_sheet_to_dataframe)
 
         Returns:
             Dictionary mapping sheet names to DataFrames
@@ -203,7 +320,7 @@ class GSheetsClient:
         sheets_metadata = self.get_all_sheets_metadata(spreadsheet_id)
         exclude_sheets = exclude_sheets or []
 
-        result = {}
+        sheet_names = []
         for sheet_info in sheets_metadata:
             sheet_name = sheet_info['title']
 
@@ -212,15 +329,27 @@ class GSheetsClient:
                 print(f"Skipping excluded sheet: {sheet_name}")
                 continue
 
-            print(f"Reading sheet: {sheet_name}")
+            sheet_names.append(sheet_name)
 
-            # Read the entire sheet
-            df = self.read_sheet_to_dataframe(
-                spreadsheet_id,
-                range_name=f"'{sheet_name}'",
-                header_row=header_row
-            )
+        if not sheet_names:
+            return {}
 
+        # Read every sheet in a single batchGet request instead of one per sheet
+        try:
+            response = _execute(self.service.spreadsheets().values().batchGet(
+                spreadsheetId=spreadsheet_id,
+                ranges=[f"'{sheet_name}'" for sheet_name in sheet_names],
+                valueRenderOption=value_render_option
+            ))
+        except HttpError as error:
+            print(f"An error occurred: {error}")
+            raise
+
+        # valueRanges come back in the same order as the requested ranges
+        result = {}
+        for sheet_name, value_range in zip(sheet_names, response.get('valueRanges', [])):
+            print(f"Reading sheet: {sheet_name}")
+            df = self._values_to_dataframe(value_range.get('values', []), header_row)
             result[sheet_name] = df
             print(f"  Loaded {len(df)} rows, {len(df.columns)} columns")
 
@@ -239,11 +368,11 @@ class GSheetsClient:
             range_name: The A1 notation of the range to clear (e.g., 'Sheet1' or 'Sheet1!A1:Z1000')
         """
         try:
-            self.service.spreadsheets().values().clear(
+            _execute(self.service.spreadsheets().values().clear(
                 spreadsheetId=spreadsheet_id,
                 range=range_name,
                 body={}
-            ).execute()
+            ))
             print(f"Cleared range: {range_name}")
         except HttpError as error:
             print(f"An error occurred: {error}")
@@ -277,46 +406,78 @@ class GSheetsClient:
                 # Reset index to make it a column
                 df = df.reset_index()
 
-            # Make a copy to avoid modifying the original
-            df_clean = df.copy()
-
-            # Convert datetime columns to strings to handle NaT values
-            for col in df_clean.columns:
-                if pd.api.types.is_datetime64_any_dtype(df_clean[col]):
-                    df_clean[col] = df_clean[col].astype(str).replace('NaT', '')
-
-            # Replace NaN values with empty strings for JSON serialization
-            df_clean = df_clean.fillna('')
-
-            # Get column headers
-            headers = df_clean.columns.tolist()
+            # Datetime columns become strings with NaT as ''. Only frames that
+            # have one get a (shallow, Copy-on-Write) copy, so the caller's
+            # DataFrame is never modified.
+            datetime_cols = [
+                col for col in df.columns
+                if pd.api.types.is_datetime64_any_dtype(df[col])
+            ]
+            if datetime_cols:
+                df = df.copy(deep=False)
+                for col in datetime_cols:
+                    df[col] = df[col].astype(str).where(df[col].notna(), '')
 
-            # Get data rows
-            data_rows = df_clean.values.tolist()
+            # Get data rows in one pass, with NaN/None/NA as empty strings for
+            # JSON serialization
+            values = df.to_numpy(dtype=object, na_value='').tolist()
 
-            # Combine headers and data
-            values = [headers] + data_rows
+            # Put the column headers on top in place, rather than building a
+            # second N+1 row list
+            values.insert(0, df.columns.tolist())
 
-            # Write to sheet
+            # Write to sheet: one values.batchUpdate request, with large frames
+            # split into row chunks that each target their own starting row
             body = {
-                'values': values
+                'valueInputOption': 'RAW',  # Use 'USER_ENTERED' to parse formulas
+                'data': self._chunk_value_ranges(range_name, values)
             }
 
-            result = self.service.spreadsheets().values().update(
+            result = _execute(self.service.spreadsheets().values().batchUpdate(
                 spreadsheetId=spreadsheet_id,
-                range=range_name,
-                valueInputOption='RAW',  # Use 'USER_ENTERED' to parse formulas
                 body=body
-            ).execute()
+            ))
 
             print(f"✓ Wrote {len(df)} rows and {len(df.columns)} columns to {range_name}")
-            print(f"  Updated {result.get('updatedCells')} cells")
+            print(f"  Updated {result.get('totalUpdatedCells')} cells")
 
         except HttpError as error:
             print(f"An error occurred: {error}")
             raise
 
 
+    @classmethod
+    def _chunk_value_ranges(cls, range_name: str, values: List[List[Any]]) -> List[Dict[str, Any]]:
+        """
+        Split rows into value ranges of at most WRITE_CHUNK_ROWS rows each.
+
+        Args:
+            range_name: A1 notation of where the first row goes (e.g., 'Sheet1' or 'Sheet1!B2')
+            values: Rows to write, header row included
+
+        Returns:
+            List of {'range', 'values'} dicts for values.batchUpdate
+        """
+        if len(values) <= cls.WRITE_CHUNK_ROWS:
+            return [{'range': range_name, 'values': values}]
+
+        # Work out the sheet and top-left cell each chunk is offset from
+        sheet, _, cell = range_name.rpartition('!')
+        if not sheet or range_name.endswith("'"):
+            # Bare (possibly quoted) sheet name, which may itself contain '!'
+            sheet, cell = range_name, 'A1'
+        match = _A1_CELL_RE.match(cell)
+        start_col, start_row = (match.group(1), int(match.group(2))) if match else ('A', 1)
+
+        return [
+            {
+                'range': f"{sheet}!{start_col}{start_row + offset}",
+                'values': values[offset:offset + cls.WRITE_CHUNK_ROWS]
+            }
+            for offset in range(0, len(values), cls.WRITE_CHUNK_ROWS)
+        ]
+
+
 # Convenience function for quick access
 def read_gsheet(
     spreadsheet_id: str,
@@ -6,8 +6,9 @@ with support for connection pooling and both table-based and query-based extract
 """
 
 import os
+import uuid
 import pandas as pd
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterator
 from contextlib import contextmanager
 import psycopg2
 from psycopg2 import pool
@@ -117,6 +118,41 @@ class PostgresClient:
         except Exception as e:
             raise Exception(f"Error executing query: {e}\nQuery: {query}")
 
+    def iter_query(self, query: str, params: Optional[tuple] = None,
+                   chunk_size: int = 50_000) -> Iterator[pd.DataFrame]:
+        """
+        Execute a SQL query and yield the results as DataFrames of chunk_size rows.
+
+        Uses a server-side (named) cursor, so only one chunk is held in memory
+        at a time no matter how large the result is.
+
+        Args:
+            query: SQL query to execute
+            params: Optional tuple of parameters for parameterized queries
+            chunk_size: Number of rows per yielded DataFrame
+
+        Yields:
+            DataFrames with query results
+        """
+        with self.get_connection() as connection:
+            try:
+                with connection.cursor(name=f"iter_query_{uuid.uuid4().hex}") as cursor:
+                    cursor.itersize = chunk_size
+                    cursor.execute(query, params)
+
+                    while True:
+                        rows = cursor.fetchmany(chunk_size)
+                        if not rows:
+                            break
+                        columns = [column[0] for column in cursor.description]
+                        yield pd.DataFrame.from_records(rows, columns=columns)
+            except Exception as e:
+                raise Exception(f"Error executing query: {e}\nQuery: {query}")
+            finally:
+                # Named cursors live inside a transaction; end it before the
+                # connection goes back to the pool
+                connection.rollback()
+
     def read_table(self, table_name: str, schema: Optional[str] = None,
                    columns: Optional[List[str]] = None) -> pd.DataFrame:
         """
@@ -1,16 +1,18 @@
 """
 Main orchestrator for data ingestion pipeline.
-Runs all ingestion scripts sequentially and then triggers dbt.
+Runs all ingestion scripts (concurrently, in dependency stages) and then triggers dbt.
 
 Usage:
     python ingestion/main.py              # Run full pipeline (ingestion + dbt)
     python ingestion/main.py --ingest-only  # Run ingestion only, skip dbt
 """
 
+import importlib
 import os
 import sys
 import subprocess
 import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from datetime import datetime
 import logging
@@ -35,6 +37,9 @@ if env_file.exists():
     load_dotenv(env_file)
     logger.debug(f"Loaded environment from {env_file}")
 
+# Maximum number of ingestion sources running at the same time
+MAX_WORKERS = int(os.getenv('INGESTION_MAX_WORKERS', '5'))
+
 
 def run_ingestion_scripts():
     """
@@ -42,44 +47,77 @@ def run_ingestion_scripts():
     """
     logger.info("Starting data ingestion pipeline")
 
-    # Import and run each source module
-    from ingestion.sources import purchase_form_data
-    from ingestion.sources import leads_ads_community
-    from ingestion.sources import website_form_responses
-    from ingestion.sources import leads_course_strategi_ads
-    from ingestion.sources import branding_level_up
-    from ingestion.sources import eduqat_enrollments
-    from ingestion.sources import eduqat_users
-    from ingestion.sources import eduqat_courses
-    from ingestion.sources import eduqat_survey_results
-    from ingestion.sources import ai_chat_messages
-    from ingestion.sources import ai_chat_sessions
-    from ingestion.sources import users
-
-    sources = [
-        ("purchase_form_data", purchase_form_data.ingest_purchase_data),
-        # ("leads_ads_community", leads_ads_community.ingest_leads_ads_community),
-        # ("website_form_responses", website_form_responses.ingest_website_form_responses),
-        # ("leads_course_strategi_ads", leads_course_strategi_ads.ingest_leads_course_strategi_ads),
-        # ("branding_level_up", branding_level_up.ingest_branding_level_up),
-        ("eduqat_enrollments", eduqat_enrollments.ingest_eduqat_enrollments),
-        ("eduqat_users", eduqat_users.ingest_eduqat_users),
-        ("eduqat_courses", eduqat_courses.ingest_eduqat_courses),
-        # Note: eduqat_survey_results must run AFTER eduqat_enrollments (depends on completions data)
-        ("eduqat_survey_results", eduqat_survey_results.ingest_eduqat_survey_results),
-        ("ai_chat_messages", ai_chat_messages.ingest_ai_chat_messages),
-        ("ai_chat_sessions", ai_chat_sessions.ingest_ai_chat_sessions),
-        ("users", users.ingest_users),
+    # Create/upgrade the raw tables once, before the sources run concurrently
+    from ingestion.utils.db import run_migrations
+    run_migrations()
+
+    # Sources within a stage are independent (each loads its own raw table over
+    # its own connections) and run concurrently; stages run one after another.
+    # Each entry is (source_name, module, ingest function name); modules are
+    # imported by the worker that runs them.
+    stages = [
+        [
+            ("purchase_form_data", "ingestion.sources.purchase_form_data", "ingest_purchase_data"),
+            # ("leads_ads_community", "ingestion.sources.leads_ads_community", "ingest_leads_ads_community"),
+            # ("website_form_responses", "ingestion.sources.website_form_responses", "ingest_website_form_responses"),
+            # ("leads_course_strategi_ads", "ingestion.sources.leads_course_strategi_ads", "ingest_leads_course_strategi_ads"),
+            # ("branding_level_up", "ingestion.sources.branding_level_up", "ingest_branding_level_up"),
+            ("eduqat_enrollments", "ingestion.sources.eduqat_enrollments", "ingest_eduqat_enrollments"),
+            ("eduqat_users", "ingestion.sources.eduqat_users", "ingest_eduqat_users"),
+            ("eduqat_courses", "ingestion.sources.eduqat_courses", "ingest_eduqat_courses"),
+            ("ai_chat_messages", "ingestion.sources.ai_chat_messages", "ingest_ai_chat_messages"),
+            ("ai_chat_sessions", "ingestion.sources.ai_chat_sessions", "ingest_ai_chat_sessions"),
+            ("users", "ingestion.sources.users", "ingest_users"),
+        ],
+        [
+            # Note: eduqat_survey_results must run AFTER eduqat_enrollments (depends on completions data)
+            ("eduqat_survey_results", "ingestion.sources.eduqat_survey_results", "ingest_eduqat_survey_results"),
+        ],
     ]
 
-    for source_name, ingest_func in sources:
-        logger.info(f"Running ingestion: {source_name}")
-        try:
-            ingest_func()
-            logger.info(f"Successfully completed: {source_name}")
-        except Exception as e:
-            logger.error(f"Error running {source_name}: {str(e)}")
-            raise
+    for sources in stages:
+        run_sources_concurrently(sources)
+
+
+def run_source(module_name, func_name):
+    """
+    Import a source module and run its ingest function.
+
+    Importing here rather than up front means a source whose import fails
+    only fails that source, and imports run in parallel on the pool.
+    """
+    module = importlib.import_module(module_name)
+    getattr(module, func_name)()
+
+
+def run_sources_concurrently(sources):
+    """
+    Run a list of (source_name, module, ingest function name) entries on a
+    thread pool.
+
+    Every source is allowed to finish; if any failed, the first failure is
+    re-raised once the whole list is done.
+    """
+    first_error = None
+
+    with ThreadPoolExecutor(max_workers=max(1, min(MAX_WORKERS, len(sources)))) as executor:
+        futures = {}
+        for source_name, module_name, func_name in sources:
+            logger.info(f"Running ingestion: {source_name}")
+            futures[executor.submit(run_source, module_name, func_name)] = source_name
+
+        for future in as_completed(futures):
+            source_name = futures[future]
+            try:
+                future.result()
+                logger.info(f"Successfully completed: {source_name}")
+            except Exception as e:
+                logger.error(f"Error running {source_name}: {str(e)}")
+                if first_error is None:
+                    first_error = e
+
+    if first_error is not None:
+        raise first_error
 
 
 def run_dbt():
@@ -0,0 +1,219 @@
+-- Raw tables with a fixed schema, created before any source loads.
+-- Idempotent: applied at the start of every pipeline run by run_migrations().
+-- The Google Sheets sources create their own tables, since their columns
+-- follow the sheet headers.
+
+CREATE SCHEMA IF NOT EXISTS raw;
+
+-- ai_chat_messages
+CREATE TABLE IF NOT EXISTS raw.ai_chat_messages (
+    id TEXT,
+    session_id TEXT,
+    role TEXT,
+    content TEXT,
+    message_order INTEGER,
+    created_at TIMESTAMP,
+    data_source VARCHAR(100),
+    extracted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS ai_chat_messages_id_key
+ON raw.ai_chat_messages (id);
+
+-- ai_chat_sessions
+CREATE TABLE IF NOT EXISTS raw.ai_chat_sessions (
+    id TEXT,
+    user_id TEXT,
+    guest_session_id TEXT,
+    title TEXT,
+    created_at TIMESTAMP,
+    updated_at TIMESTAMP,
+    data_source VARCHAR(100),
+    extracted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- purchase_form_data
+CREATE TABLE IF NOT EXISTS raw.purchase_form_data (
+    customer_name VARCHAR(255),
+    email VARCHAR(255),
+    phone_number VARCHAR(50),
+    created_at TIMESTAMP,
+    paid_at TIMESTAMP,
+    product_type VARCHAR(100),
+    course_id VARCHAR(255),
+    amount NUMERIC,
+    payment_method VARCHAR(100),
+    payment_channel VARCHAR(100),
+    data_source VARCHAR(100),
+    extracted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- users
+CREATE TABLE IF NOT EXISTS raw.users (
+    id TEXT,
+    email VARCHAR(255),
+    created_at TIMESTAMP,
+    updated_at TIMESTAMP,
+    role VARCHAR(50),
+    eduqat_user_id VARCHAR(255),
+    name VARCHAR(255),
+    mobile VARCHAR(50),
+    mobile_verified BOOLEAN,
+    mobile_verified_at TIMESTAMP,
+    avatar_url TEXT,
+    birth_date DATE,
+    address TEXT,
+    city VARCHAR(255),
+    province VARCHAR(255),
+    postal_code VARCHAR(20),
+    language_preference VARCHAR(10),
+    ai_tone_preference VARCHAR(50),
+    interests JSONB,
+    level VARCHAR(50),
+    voice_preference VARCHAR(50),
+    latitude DOUBLE PRECISION,
+    longitude DOUBLE PRECISION,
+    segment VARCHAR(100),
+    business_name VARCHAR(255),
+    data_source VARCHAR(100),
+    extracted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- eduqat_enrollments
+CREATE TABLE IF NOT EXISTS raw.eduqat_enrollments (
+    id VARCHAR(255) PRIMARY KEY,
+    uid VARCHAR(255),
+    user_id VARCHAR(255),
+    course_id INTEGER,
+    price_id INTEGER,
+    schedule_id INTEGER,
+    order_uid VARCHAR(255),
+    order_data JSONB,
+    timezone VARCHAR(100),
+    learning_progress FLOAT,
+    learning_time INTEGER,
+    completed_at TIMESTAMP,
+    expires_at TIMESTAMP,
+    created_at TIMESTAMP,
+    -- Nested JSON stored as JSONB
+    user_data JSONB,
+    metadata JSONB,
+    completions JSONB,
+    certificates JSONB,
+    user_groups JSONB,
+    user_group_admins JSONB,
+    -- Metadata
+    data_source VARCHAR(100),
+    extracted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- eduqat_courses
+CREATE TABLE IF NOT EXISTS raw.eduqat_courses (
+    id INTEGER PRIMARY KEY,
+    name VARCHAR(500),
+    slug VARCHAR(500),
+    description TEXT,
+    type VARCHAR(50),
+    status VARCHAR(50),
+    author VARCHAR(255),
+    duration INTEGER,
+    language_codes JSONB,
+    categories JSONB,
+    educators JSONB,
+    images JSONB,
+    prices JSONB,
+    tags JSONB,
+    metadata JSONB,
+    parent INTEGER,
+    timezone VARCHAR(100),
+    total_student INTEGER,
+    rating NUMERIC,
+    progress_status VARCHAR(50),
+    start_date TIMESTAMP,
+    end_date TIMESTAMP,
+    published_at TIMESTAMP,
+    -- Ingestion metadata
+    data_source VARCHAR(100),
+    extracted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- eduqat_users
+CREATE TABLE IF NOT EXISTS raw.eduqat_users (
+    id INTEGER PRIMARY KEY,
+    user_id INTEGER,
+    subid VARCHAR(255),
+    user_name VARCHAR(255),
+    name VARCHAR(255),
+    email VARCHAR(255),
+    phone_number VARCHAR(50),
+    phone_country VARCHAR(50),
+    phone_country_calling_code VARCHAR(10),
+    description TEXT,
+    avatar_url TEXT,
+    role VARCHAR(50),
+    status VARCHAR(50),
+    total_course INTEGER,
+    total_enrollment INTEGER,
+    stripe_customer_ids JSONB,
+    metadata JSONB,
+    pre_signup_at TIMESTAMP,
+    confirmed_at TIMESTAMP,
+    last_loggin_at TIMESTAMP,
+    created_at TIMESTAMP,
+    -- Ingestion metadata
+    data_source VARCHAR(100),
+    extracted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- eduqat_ai_conversations
+CREATE TABLE IF NOT EXISTS raw.eduqat_ai_conversations (
+    id INTEGER PRIMARY KEY,
+    conversation_id VARCHAR(255) UNIQUE,
+    user_id VARCHAR(255),
+    enrollment_id VARCHAR(255),
+    course_id INTEGER,
+    material_id INTEGER,
+    status VARCHAR(50),
+    score INTEGER,
+    content TEXT,
+    audio_url TEXT,
+    x_site_id VARCHAR(100),
+    educator_id VARCHAR(255),
+    created_at TIMESTAMP,
+    updated_at TIMESTAMP,
+    -- Nested JSON stored as JSONB
+    user_data JSONB,
+    educator_data JSONB,
+    messages JSONB,
+    -- Metadata
+    data_source VARCHAR(100),
+    extracted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- eduqat_survey_results
+CREATE TABLE IF NOT EXISTS raw.eduqat_survey_results (
+    -- Composite primary key
+    enrollment_id VARCHAR(255),
+    material_id VARCHAR(255),
+
+    -- Foreign keys / context
+    survey_id VARCHAR(255),
+    course_id INTEGER,
+    user_id VARCHAR(255),
+
+    -- Survey metadata
+    survey_type VARCHAR(50),
+    survey_title TEXT,
+
+    -- Full survey response data as JSONB
+    elements JSONB,
+
+    -- Completion info
+    completed_at TIMESTAMP,
+
+    -- Metadata
+    data_source VARCHAR(100),
+    extracted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+
+    PRIMARY KEY (enrollment_id, material_id)
+);
@@ -0,0 +1,17 @@
+-- raw.eduqat_enrollments.order_data was first created as BOOLEAN; it holds
+-- the order object, so convert it to JSONB where that hasn't happened yet.
+
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1
+        FROM information_schema.columns
+        WHERE table_schema = 'raw'
+          AND table_name = 'eduqat_enrollments'
+          AND column_name = 'order_data'
+          AND data_type = 'boolean'
+    ) THEN
+        ALTER TABLE raw.eduqat_enrollments
+        ALTER COLUMN order_data TYPE JSONB USING order_data::text::jsonb;
+    END IF;
+END $$;
@@ -5,17 +5,19 @@ This script pulls AI chat message data from the product database.
 """
 
 import os
-import sys
-from pathlib import Path
 import logging
-from datetime import datetime
-
-# Add parent directory to path for imports
-sys.path.insert(0, str(Path(__file__).parent.parent))
+from datetime import datetime, timezone
+import pandas as pd
 
 from ingestion.lib.postgres_client import PostgresClient
 from ingestion.lib.column_mappings import apply_column_mapping
-from ingestion.utils.db import get_db_connection
+from ingestion.utils.db import (
+    copy_dataframe,
+    get_db_connection,
+    release_db_connection,
+    run_migrations,
+    strip_timezones,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -23,10 +25,49 @@ logger = logging.getLogger(__name__)
 SOURCE_NAME = 'ai_chat_messages'
 SOURCE_DB_URL = os.getenv('PRODUCT_DB_URL')
 
+# Column order of the raw table, as loaded
+LOAD_COLUMNS = [
+    'id',
+    'session_id',
+    'role',
+    'content',
+    'message_order',
+    'created_at',
+    'data_source',
+    'extracted_at',
+]
+
+
+# Rows per server-side cursor fetch / COPY batch
+CHUNK_SIZE = 50_000
+
+
+def _prepare_chunk(df: pd.DataFrame, extracted_at: datetime) -> pd.DataFrame:
+    """Map one chunk of source rows to the raw table's columns and types."""
+    df = apply_column_mapping(df)
+
+    # Add metadata
+    df['data_source'] = SOURCE_NAME
+    df['extracted_at'] = extracted_at
+
+    # Raw table column order
+    out = df.reindex(columns=LOAD_COLUMNS)
+    out['message_order'] = pd.to_numeric(out['message_order']).astype('Int64')
+    return strip_timezones(out)
 
-def ingest_ai_chat_messages():
+
+def ingest_ai_chat_messages(full_refresh: bool = False):
     """
     Ingest AI chat messages data from the product database.
+
+    Incremental by default: only messages created at or after the newest
+    created_at already in raw.ai_chat_messages are extracted, then upserted
+    by id. An empty target table (or full_refresh=True) loads everything;
+    messages with no created_at are only picked up by such a load.
+
+    Args:
+        full_refresh: Ignore the watermark, re-extract every message and
+            replace the table contents
     """
     logger.info(f"Starting ingestion for {SOURCE_NAME}")
 
@@ -35,117 +76,96 @@ def ingest_ai_chat_messages():
         return
 
     try:
-        # Connect to source database (product DB)
-        with PostgresClient(SOURCE_DB_URL) as source_client:
-            logger.info("Connected to source database")
-
-            # Execute the query from the source config
-            query = """
-                SELECT
-                    id,
-                    session_id,
-                    role,
-                    content,
-                    message_order,
-                    created_at
-                FROM ai_chat_messages
-            """
-
-            df = source_client.execute_query(query)
-            logger.info(f"Extracted {len(df)} rows from source")
-
-            if df.empty:
-                logger.warning("No data extracted, skipping")
+        # Connect to analytics database first to read the watermark
+        conn = get_db_connection()
+        cursor = conn.cursor()
+
+        try:
+            watermark = None
+            if not full_refresh:
+                cursor.execute(f"SELECT max(created_at) FROM raw.{SOURCE_NAME};")
+                watermark = cursor.fetchone()[0]
+
+            conn.commit()
+
+            # Stage into a temp table chunk by chunk, then upsert by id
+            column_list = ', '.join(LOAD_COLUMNS)
+            cursor.execute(f"""
+                CREATE TEMP TABLE {SOURCE_NAME}_incoming
+                (LIKE raw.{SOURCE_NAME} INCLUDING DEFAULTS)
+                ON COMMIT DROP;
+            """)
+
+            # Connect to source database (product DB)
+            with PostgresClient(SOURCE_DB_URL) as source_client:
+                logger.info("Connected to source database")
+
+                # Execute the query from the source config
+                query = """
+                    SELECT
+                        id,
+                        session_id,
+                        role,
+                        content,
+                        message_order,
+                        created_at
+                    FROM ai_chat_messages
+                """
+                params = None
+                if watermark is not None:
+                    # >= so rows sharing the watermark timestamp that landed
+                    # after the last run aren't missed; the upsert absorbs repeats
+                    query += " WHERE created_at >= %s"
+                    # raw created_at is naive UTC; make that explicit so the
+                    # source session's TimeZone can't shift the comparison
+                    params = (watermark.replace(tzinfo=timezone.utc),)
+                    logger.info(f"Extracting messages created since {watermark}")
+
+                # Stream from a server-side cursor so only one chunk of
+                # messages is held in memory at a time
+                extracted_at = datetime.now(timezone.utc).replace(tzinfo=None)
+                total_rows = 0
+                for chunk in source_client.iter_query(query, params=params, chunk_size=CHUNK_SIZE):
+                    copy_dataframe(cursor, f"{SOURCE_NAME}_incoming", _prepare_chunk(chunk, extracted_at))
+                    total_rows += len(chunk)
+                    logger.info(f"Staged {total_rows} rows")
+
+            logger.info(f"Extracted {total_rows} rows from source")
+
+            if total_rows == 0:
+                if watermark is not None:
+                    logger.info("No new messages since the last run, skipping")
+                else:
+                    logger.warning("No data extracted, skipping")
+                conn.rollback()
                 return
 
-            # Apply column mapping
-            df = apply_column_mapping(df)
-
-            # Add metadata
-            df['data_source'] = SOURCE_NAME
-            df['extracted_at'] = datetime.utcnow()
-
-            # Convert DataFrame to list of dicts with Python native types
-            import pandas as pd
-            import numpy as np
-
-            def convert_value(val):
-                """Convert pandas/numpy types to Python native types."""
-                if pd.isna(val):
-                    return None
-                if isinstance(val, (pd.Timestamp, np.datetime64)):
-                    return pd.Timestamp(val).to_pydatetime()
-                if isinstance(val, np.integer):
-                    return int(val)
-                if isinstance(val, np.floating):
-                    return float(val)
-                return val
-
-            records = df.to_dict('records')
-            for record in records:
-                for key, val in record.items():
-                    record[key] = convert_value(val)
-
             # Load to analytics database (raw schema)
             logger.info("Loading data to analytics database")
-            conn = get_db_connection()
-            cursor = conn.cursor()
-
-            try:
-                # Create raw schema if it doesn't exist
-                cursor.execute("CREATE SCHEMA IF NOT EXISTS raw;")
-
-                # Create table if it doesn't exist
-                cursor.execute(f"""
-                    CREATE TABLE IF NOT EXISTS raw.{SOURCE_NAME} (
-                        id TEXT,
-                        session_id TEXT,
-                        role TEXT,
-                        content TEXT,
-                        message_order INTEGER,
-                        created_at TIMESTAMP,
-                        data_source VARCHAR(100),
-                        extracted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    );
-                """)
-
-                # Truncate and reload (full refresh)
+
+            if full_refresh:
+                # Full refresh also drops rows that no longer exist at the source
                 cursor.execute(f"TRUNCATE TABLE raw.{SOURCE_NAME};")
 
-                # Insert data
-                for row in records:
-                    cursor.execute(f"""
-                        INSERT INTO raw.{SOURCE_NAME} (
-                            id,
-                            session_id,
-                            role,
-                            content,
-                            message_order,
-                            created_at,
-                            data_source,
-                            extracted_at
-                        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s);
-                    """, (
-                        row.get('id'),
-                        row.get('session_id'),
-                        row.get('role'),
-                        row.get('content'),
-                        row.get('message_order'),
-                        row.get('created_at'),
-                        row.get('data_source'),
-                        row.get('extracted_at')
-                    ))
-
-                conn.commit()
-                logger.info(f"✓ Successfully loaded {len(df)} rows to raw.{SOURCE_NAME}")
-
-            except Exception as e:
-                conn.rollback()
-                logger.error(f"Error loading data: {str(e)}")
-                raise
-            finally:
-                cursor.close()
-                conn.close()
+            update_list = ', '.join(f"{col} = EXCLUDED.{col}" for col in LOAD_COLUMNS if col != 'id')
+            cursor.execute(f"""
+                INSERT INTO raw.{SOURCE_NAME} ({column_list})
+                SELECT DISTINCT ON (id) {column_list}
+                FROM {SOURCE_NAME}_incoming
+                ORDER BY id
+                ON CONFLICT (id) DO UPDATE SET {update_list};
+            """)
+
+            conn.commit()
+            logger.info(f"✓ Successfully loaded {total_rows} rows to raw.{SOURCE_NAME}")
+
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Error loading data: {str(e)}")
+            raise
+        finally:
+            cursor.close()
+            release_db_connection(conn)
 
     except Exception as e:
         logger.error(f"Error ingesting {SOURCE_NAME}: {str(e)}")
@@ -153,4 +173,5 @@ def ingest_ai_chat_messages():
 
 
 if __name__ == "__main__":
+    run_migrations()
     ingest_ai_chat_messages()
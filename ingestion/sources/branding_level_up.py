@@ -5,17 +5,19 @@ Note: Only reads the 'All Data' sheet to avoid API rate limits.
 """
 
 import os
-import sys
-from pathlib import Path
 import logging
-from datetime import datetime
+from datetime import datetime, timezone
 import pandas as pd
 
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
 from ingestion.lib.gsheets_client import GSheetsClient
 from ingestion.lib.column_mappings import apply_column_mapping
-from ingestion.utils.db import get_db_connection
+from ingestion.utils.db import (
+    copy_dataframe,
+    create_staging_table,
+    get_db_connection,
+    release_db_connection,
+    replace_from_staging,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -45,7 +47,7 @@ def ingest_branding_level_up():
 
         df = apply_column_mapping(df)
         df['data_source'] = SOURCE_NAME
-        df['extracted_at'] = datetime.utcnow()
+        df['extracted_at'] = datetime.now(timezone.utc).replace(tzinfo=None)
 
         # Rename 'id' column if it exists to avoid conflict with SERIAL PRIMARY KEY
         if 'id' in df.columns:
@@ -68,13 +70,11 @@ def ingest_branding_level_up():
                 );
             """)
 
-            cursor.execute(f"TRUNCATE TABLE raw.{SOURCE_NAME} CASCADE;")
-
-            for _, row in df.iterrows():
-                col_names = ', '.join([f'"{col}"' for col in columns])
-                placeholders = ', '.join(['%s'] * len(columns))
-                values = [row.get(col) for col in columns]
-                cursor.execute(f"INSERT INTO raw.{SOURCE_NAME} ({col_names}) VALUES ({placeholders});", values)
+            # Bulk load with COPY into a staging table, then swap the rows
+            # into the live table
+            staging = create_staging_table(cursor, f"raw.{SOURCE_NAME}")
+            copy_dataframe(cursor, staging, df)
+            replace_from_staging(cursor, f"raw.{SOURCE_NAME}", staging, columns, cascade=True)
 
             conn.commit()
             logger.info(f"✓ Successfully loaded {len(df)} rows to raw.{SOURCE_NAME}")
@@ -84,7 +84,7 @@ def ingest_branding_level_up():
             raise
         finally:
             cursor.close()
-            conn.close()
+            release_db_connection(conn)
 
     except Exception as e:
         logger.error(f"Error ingesting {SOURCE_NAME}: {str(e)}")
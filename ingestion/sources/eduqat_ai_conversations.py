@@ -12,22 +12,78 @@ Endpoints used:
 
 import os
 import sys
-import json
-from pathlib import Path
 import logging
-from datetime import datetime
-
-# Add parent directory to path for imports
-sys.path.insert(0, str(Path(__file__).parent.parent))
+from datetime import datetime, timezone
 
 from ingestion.lib.eduqat_client import EduqatClient, EduqatApiError
-from ingestion.utils.db import get_db_connection
+from ingestion.utils.db import (
+    copy_rows,
+    create_staging_table,
+    get_db_connection,
+    release_db_connection,
+    replace_from_staging,
+    run_migrations,
+    to_jsonb,
+)
+from ingestion.utils.streaming import prefetch
 
 logger = logging.getLogger(__name__)
 
 # Source configuration
 SOURCE_NAME = 'eduqat_ai_conversations'
 
+# Columns loaded per row; data_source and extracted_at are the same for the
+# whole load and are filled in when the staged rows are swapped in
+LOAD_COLUMNS = [
+    'id',
+    'conversation_id',
+    'user_id',
+    'enrollment_id',
+    'course_id',
+    'material_id',
+    'status',
+    'score',
+    'content',
+    'audio_url',
+    'x_site_id',
+    'educator_id',
+    'created_at',
+    'updated_at',
+    'user_data',
+    'educator_data',
+    'messages',
+]
+
+# Concurrent message requests; matches the client's connection pool size
+MESSAGE_FETCH_WORKERS = 16
+
+# Rows buffered per COPY; rows carry their full message history, so keep
+# this to a few pages rather than copy_rows' default
+COPY_BATCH_ROWS = 500
+
+
+def _iter_conversation_pages(client: EduqatClient):
+    """
+    Yield every page of AI conversations with their messages attached.
+
+    Each page's messages are fetched concurrently before the page is
+    yielded.
+    """
+    for conversations in client.iter_ai_conversation_pages():
+        conversation_ids = [conv['conversation_id'] for conv in conversations if conv.get('conversation_id')]
+        messages_by_id = client.get_ai_conversation_messages_batch(
+            conversation_ids,
+            max_workers=MESSAGE_FETCH_WORKERS,
+            return_exceptions=True
+        )
+        for conv in conversations:
+            messages = messages_by_id.get(conv.get('conversation_id'), [])
+            if isinstance(messages, EduqatApiError):
+                logger.warning(f"Failed to fetch messages for {conv['conversation_id']}: {messages.message}")
+                messages = []
+            conv['messages'] = messages
+        yield conversations
+
 
 def ingest_eduqat_ai_conversations():
     """
@@ -49,105 +105,23 @@ def ingest_eduqat_ai_conversations():
         client = EduqatClient()
         logger.info("Connected to Eduqat API")
 
-        # Get all conversations (paginated)
-        response = client.get_ai_conversations()
-        conversations = response.get('items', [])
-        count = response.get('count', len(conversations))
-
-        logger.info(f"Extracted {count} AI conversations from Eduqat API")
-
-        if not conversations:
-            logger.warning("No AI conversations extracted, skipping")
-            return
-
-        # Fetch messages for each conversation
-        logger.info("Fetching messages for each conversation...")
-        for i, conv in enumerate(conversations):
-            conversation_id = conv.get('conversation_id')
-            if conversation_id:
-                try:
-                    messages_response = client.get_ai_conversation_messages(conversation_id)
-                    conv['messages'] = messages_response.get('messages', [])
-                    logger.debug(f"Fetched {len(conv['messages'])} messages for conversation {conversation_id}")
-                except EduqatApiError as e:
-                    logger.warning(f"Failed to fetch messages for {conversation_id}: {e.message}")
-                    conv['messages'] = []
-            else:
-                conv['messages'] = []
-
-            # Log progress every 50 conversations
-            if (i + 1) % 50 == 0:
-                logger.info(f"Fetched messages for {i + 1}/{count} conversations")
-
-        logger.info(f"Completed fetching messages for all {count} conversations")
-
         # Load to analytics database (raw schema)
         logger.info("Loading data to analytics database")
         conn = get_db_connection()
         cursor = conn.cursor()
 
         try:
-            # Create raw schema if it doesn't exist
-            cursor.execute("CREATE SCHEMA IF NOT EXISTS raw;")
-
-            # Create table with JSONB columns for nested data
-            cursor.execute(f"""
-                CREATE TABLE IF NOT EXISTS raw.{SOURCE_NAME} (
-                    id INTEGER PRIMARY KEY,
-                    conversation_id VARCHAR(255) UNIQUE,
-                    user_id VARCHAR(255),
-                    enrollment_id VARCHAR(255),
-                    course_id INTEGER,
-                    material_id INTEGER,
-                    status VARCHAR(50),
-                    score INTEGER,
-                    content TEXT,
-                    audio_url TEXT,
-                    x_site_id VARCHAR(100),
-                    educator_id VARCHAR(255),
-                    created_at TIMESTAMP,
-                    updated_at TIMESTAMP,
-                    -- Nested JSON stored as JSONB
-                    user_data JSONB,
-                    educator_data JSONB,
-                    messages JSONB,
-                    -- Metadata
-                    data_source VARCHAR(100),
-                    extracted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                );
-            """)
-
-            # Truncate and reload (full refresh)
-            cursor.execute(f"TRUNCATE TABLE raw.{SOURCE_NAME};")
-
-            # Insert data
-            for conv in conversations:
-                cursor.execute(f"""
-                    INSERT INTO raw.{SOURCE_NAME} (
-                        id,
-                        conversation_id,
-                        user_id,
-                        enrollment_id,
-                        course_id,
-                        material_id,
-                        status,
-                        score,
-                        content,
-                        audio_url,
-                        x_site_id,
-                        educator_id,
-                        created_at,
-                        updated_at,
-                        user_data,
-                        educator_data,
-                        messages,
-                        data_source,
-                        extracted_at
-                    ) VALUES (
-                        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-                        %s, %s, %s, %s, %s, %s, %s, %s, %s
-                    );
-                """, (
+            # Full refresh: load into a staging table, then swap the rows
+            # into the live table at the end
+            staging = create_staging_table(cursor, f"raw.{SOURCE_NAME}")
+
+            # Stream conversations page by page straight into batched COPYs,
+            # so only a few pages of API results are held in memory. The next
+            # page is fetched in the background while earlier ones are loaded.
+            logger.info("Streaming AI conversations and their messages from Eduqat API")
+            extracted_at = datetime.now(timezone.utc).replace(tzinfo=None)
+            rows = (
+                (
                     conv.get('id'),
                     conv.get('conversation_id'),
                     conv.get('user_id'),
@@ -162,15 +136,28 @@ def ingest_eduqat_ai_conversations():
                     conv.get('educator_id'),
                     conv.get('created_at'),
                     conv.get('updated_at'),
-                    json.dumps(conv.get('user')) if conv.get('user') else None,
-                    json.dumps(conv.get('educator')) if conv.get('educator') else None,
-                    json.dumps(conv.get('messages')) if conv.get('messages') else None,
-                    SOURCE_NAME,
-                    datetime.utcnow()
-                ))
-
+                    to_jsonb(conv.get('user')),
+                    to_jsonb(conv.get('educator')),
+                    to_jsonb(conv.get('messages'))
+                )
+                for conversations in prefetch(_iter_conversation_pages(client))
+                for conv in conversations
+            )
+            loaded = copy_rows(cursor, staging, LOAD_COLUMNS, rows, batch_size=COPY_BATCH_ROWS)
+            logger.info(f"Extracted {loaded} AI conversations from Eduqat API")
+
+            if not loaded:
+                # Keep the previous load rather than leaving the table empty
+                logger.warning("No AI conversations extracted, skipping")
+                conn.rollback()
+                return
+
+            replace_from_staging(
+                cursor, f"raw.{SOURCE_NAME}", staging, LOAD_COLUMNS,
+                constants={'data_source': SOURCE_NAME, 'extracted_at': extracted_at}
+            )
             conn.commit()
-            logger.info(f"Successfully loaded {len(conversations)} rows to raw.{SOURCE_NAME}")
+            logger.info(f"Successfully loaded {loaded} rows to raw.{SOURCE_NAME}")
 
         except Exception as e:
             conn.rollback()
@@ -178,7 +165,7 @@ def ingest_eduqat_ai_conversations():
             raise
         finally:
             cursor.close()
-            conn.close()
+            release_db_connection(conn)
 
     except EduqatApiError as e:
         logger.error(f"Eduqat API error: {e.message} (status: {e.status_code})")
@@ -190,4 +177,5 @@ def ingest_eduqat_ai_conversations():
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO, stream=sys.stdout)
+    run_migrations()
     ingest_eduqat_ai_conversations()
@@ -6,22 +6,53 @@ This script pulls course data from the Eduqat public API.
 
 import os
 import sys
-import json
-from pathlib import Path
 import logging
-from datetime import datetime
-
-# Add parent directory to path for imports
-sys.path.insert(0, str(Path(__file__).parent.parent))
+from datetime import datetime, timezone
 
 from ingestion.lib.eduqat_client import EduqatClient, EduqatApiError
-from ingestion.utils.db import get_db_connection
+from ingestion.utils.db import (
+    copy_rows,
+    create_staging_table,
+    get_db_connection,
+    release_db_connection,
+    replace_from_staging,
+    run_migrations,
+    to_jsonb,
+)
 
 logger = logging.getLogger(__name__)
 
 # Source configuration
 SOURCE_NAME = 'eduqat_courses'
 
+# Columns loaded per row; data_source and extracted_at are the same for the
+# whole load and are filled in when the staged rows are swapped in
+LOAD_COLUMNS = [
+    'id',
+    'name',
+    'slug',
+    'description',
+    'type',
+    'status',
+    'author',
+    'duration',
+    'language_codes',
+    'categories',
+    'educators',
+    'images',
+    'prices',
+    'tags',
+    'metadata',
+    'parent',
+    'timezone',
+    'total_student',
+    'rating',
+    'progress_status',
+    'start_date',
+    'end_date',
+    'published_at',
+]
+
 
 def ingest_eduqat_courses():
     """
@@ -58,79 +89,14 @@ def ingest_eduqat_courses():
         cursor = conn.cursor()
 
         try:
-            # Create raw schema if it doesn't exist
-            cursor.execute("CREATE SCHEMA IF NOT EXISTS raw;")
-
-            # Create table
-            cursor.execute(f"""
-                CREATE TABLE IF NOT EXISTS raw.{SOURCE_NAME} (
-                    id INTEGER PRIMARY KEY,
-                    name VARCHAR(500),
-                    slug VARCHAR(500),
-                    description TEXT,
-                    type VARCHAR(50),
-                    status VARCHAR(50),
-                    author VARCHAR(255),
-                    duration INTEGER,
-                    language_codes JSONB,
-                    categories JSONB,
-                    educators JSONB,
-                    images JSONB,
-                    prices JSONB,
-                    tags JSONB,
-                    metadata JSONB,
-                    parent INTEGER,
-                    timezone VARCHAR(100),
-                    total_student INTEGER,
-                    rating NUMERIC,
-                    progress_status VARCHAR(50),
-                    start_date TIMESTAMP,
-                    end_date TIMESTAMP,
-                    published_at TIMESTAMP,
-                    -- Ingestion metadata
-                    data_source VARCHAR(100),
-                    extracted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                );
-            """)
-
-            # Truncate and reload (full refresh)
-            cursor.execute(f"TRUNCATE TABLE raw.{SOURCE_NAME};")
-
-            # Insert data
-            for course in courses:
-                cursor.execute(f"""
-                    INSERT INTO raw.{SOURCE_NAME} (
-                        id,
-                        name,
-                        slug,
-                        description,
-                        type,
-                        status,
-                        author,
-                        duration,
-                        language_codes,
-                        categories,
-                        educators,
-                        images,
-                        prices,
-                        tags,
-                        metadata,
-                        parent,
-                        timezone,
-                        total_student,
-                        rating,
-                        progress_status,
-                        start_date,
-                        end_date,
-                        published_at,
-                        data_source,
-                        extracted_at
-                    ) VALUES (
-                        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-                        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-                        %s, %s, %s, %s, %s
-                    );
-                """, (
+            # Full refresh: load into a staging table, then swap the rows
+            # into the live table at the end
+            staging = create_staging_table(cursor, f"raw.{SOURCE_NAME}")
+
+            # Bulk load with COPY
+            extracted_at = datetime.now(timezone.utc).replace(tzinfo=None)
+            rows = [
+                (
                     course.get('id'),
                     course.get('name'),
                     course.get('slug'),
@@ -139,13 +105,13 @@ def ingest_eduqat_courses():
                     course.get('status'),
                     course.get('author'),
                     course.get('duration'),
-                    json.dumps(course.get('language_codes')) if course.get('language_codes') else None,
-                    json.dumps(course.get('categories')) if course.get('categories') else None,
-                    json.dumps(course.get('educators')) if course.get('educators') else None,
-                    json.dumps(course.get('images')) if course.get('images') else None,
-                    json.dumps(course.get('prices')) if course.get('prices') else None,
-                    json.dumps(course.get('tags')) if course.get('tags') else None,
-                    json.dumps(course.get('metadata')) if course.get('metadata') else None,
+                    to_jsonb(course.get('language_codes')),
+                    to_jsonb(course.get('categories')),
+                    to_jsonb(course.get('educators')),
+                    to_jsonb(course.get('images')),
+                    to_jsonb(course.get('prices')),
+                    to_jsonb(course.get('tags')),
+                    to_jsonb(course.get('metadata')),
                     course.get('parent'),
                     course.get('timezone'),
                     course.get('total_student'),
@@ -153,10 +119,15 @@ def ingest_eduqat_courses():
                     course.get('progress_status'),
                     course.get('start_date'),
                     course.get('end_date'),
-                    course.get('published_at'),
-                    SOURCE_NAME,
-                    datetime.utcnow()
-                ))
+                    course.get('published_at')
+                )
+                for course in courses
+            ]
+            copy_rows(cursor, staging, LOAD_COLUMNS, rows)
+            replace_from_staging(
+                cursor, f"raw.{SOURCE_NAME}", staging, LOAD_COLUMNS,
+                constants={'data_source': SOURCE_NAME, 'extracted_at': extracted_at}
+            )
 
             conn.commit()
             logger.info(f"✓ Successfully loaded {len(courses)} rows to raw.{SOURCE_NAME}")
@@ -167,7 +138,7 @@ def ingest_eduqat_courses():
             raise
         finally:
             cursor.close()
-            conn.close()
+            release_db_connection(conn)
 
     except EduqatApiError as e:
         logger.error(f"Eduqat API error: {e.message} (status: {e.status_code})")
@@ -179,4 +150,5 @@ def ingest_eduqat_courses():
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO, stream=sys.stdout)
+    run_migrations()
     ingest_eduqat_courses()
@@ -8,22 +8,54 @@ as JSONB columns for later extraction.
 
 import os
 import sys
-import json
-from pathlib import Path
 import logging
-from datetime import datetime
-
-# Add parent directory to path for imports
-sys.path.insert(0, str(Path(__file__).parent.parent))
+from datetime import datetime, timezone
 
 from ingestion.lib.eduqat_client import EduqatClient, EduqatApiError
-from ingestion.utils.db import get_db_connection
+from ingestion.utils.db import (
+    copy_rows,
+    create_staging_table,
+    get_db_connection,
+    release_db_connection,
+    replace_from_staging,
+    run_migrations,
+    to_jsonb,
+)
+from ingestion.utils.streaming import prefetch
 
 logger = logging.getLogger(__name__)
 
 # Source configuration
 SOURCE_NAME = 'eduqat_enrollments'
 
+# Enrollments fetched ahead of the load (ten pages)
+PREFETCH_ROWS = 1000
+
+# Columns loaded per row; data_source and extracted_at are the same for the
+# whole load and are filled in when the staged rows are swapped in
+LOAD_COLUMNS = [
+    'id',
+    'uid',
+    'user_id',
+    'course_id',
+    'price_id',
+    'schedule_id',
+    'order_uid',
+    'order_data',
+    'timezone',
+    'learning_progress',
+    'learning_time',
+    'completed_at',
+    'expires_at',
+    'created_at',
+    'user_data',
+    'metadata',
+    'completions',
+    'certificates',
+    'user_groups',
+    'user_group_admins',
+]
+
 
 def ingest_eduqat_enrollments():
     """
@@ -45,103 +77,23 @@ def ingest_eduqat_enrollments():
         client = EduqatClient()
         logger.info("Connected to Eduqat API")
 
-        response = client.get_enrollments()
-        enrollments = response.get('items', [])
-        count = response.get('count', len(enrollments))
-
-        logger.info(f"Extracted {count} enrollments from Eduqat API")
-
-        if not enrollments:
-            logger.warning("No enrollments extracted, skipping")
-            return
-
         # Load to analytics database (raw schema)
         logger.info("Loading data to analytics database")
         conn = get_db_connection()
         cursor = conn.cursor()
 
         try:
-            # Create raw schema if it doesn't exist
-            cursor.execute("CREATE SCHEMA IF NOT EXISTS raw;")
-
-            # Create table with JSONB columns for nested data
-            cursor.execute(f"""
-                CREATE TABLE IF NOT EXISTS raw.{SOURCE_NAME} (
-                    id VARCHAR(255) PRIMARY KEY,
-                    uid VARCHAR(255),
-                    user_id VARCHAR(255),
-                    course_id INTEGER,
-                    price_id INTEGER,
-                    schedule_id INTEGER,
-                    order_uid VARCHAR(255),
-                    order_data JSONB,
-                    timezone VARCHAR(100),
-                    learning_progress FLOAT,
-                    learning_time INTEGER,
-                    completed_at TIMESTAMP,
-                    expires_at TIMESTAMP,
-                    created_at TIMESTAMP,
-                    -- Nested JSON stored as JSONB
-                    user_data JSONB,
-                    metadata JSONB,
-                    completions JSONB,
-                    certificates JSONB,
-                    user_groups JSONB,
-                    user_group_admins JSONB,
-                    -- Metadata
-                    data_source VARCHAR(100),
-                    extracted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                );
-            """)
-
-            # Fix order_data column type if it's wrong (migration from BOOLEAN to JSONB)
-            try:
-                cursor.execute(f"""
-                    ALTER TABLE raw.{SOURCE_NAME}
-                    ALTER COLUMN order_data TYPE JSONB USING order_data::text::jsonb;
-                """)
-                conn.commit()
-                logger.info("Migrated order_data column from BOOLEAN to JSONB")
-            except Exception as e:
-                # Column might already be JSONB or doesn't exist, rollback and continue
-                conn.rollback()
-                logger.debug(f"Could not alter order_data column (might already be correct type): {e}")
-
-            # Truncate and reload (full refresh)
-            cursor.execute(f"TRUNCATE TABLE raw.{SOURCE_NAME};")
-
-            # Insert data
-            for enrollment in enrollments:
-                cursor.execute(f"""
-                    INSERT INTO raw.{SOURCE_NAME} (
-                        id,
-                        uid,
-                        user_id,
-                        course_id,
-                        price_id,
-                        schedule_id,
-                        order_uid,
-                        order_data,
-                        timezone,
-                        learning_progress,
-                        learning_time,
-                        completed_at,
-                        expires_at,
-                        created_at,
-                        user_data,
-                        metadata,
-                        completions,
-                        certificates,
-                        user_groups,
-                        user_group_admins,
-                        data_source,
-                        extracted_at
-                    ) VALUES (
-                        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-                        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-                        %s, %s
-                    );
-                """, (
+            # Full refresh: load into a staging table, then swap the rows
+            # into the live table at the end
+            staging = create_staging_table(cursor, f"raw.{SOURCE_NAME}")
+
+            # Stream enrollments page by page straight into batched COPYs,
+            # so only a few pages of API results are held in memory. Pages
+            # are fetched in the background while earlier rows are loaded.
+            logger.info("Streaming enrollments from Eduqat API")
+            extracted_at = datetime.now(timezone.utc).replace(tzinfo=None)
+            rows = (
+                (
                     enrollment.get('id'),
                     enrollment.get('uid'),
                     enrollment.get('user_id'),
@@ -149,25 +101,37 @@ def ingest_eduqat_enrollments():
                     enrollment.get('price_id'),
                     enrollment.get('schedule_id'),
                     enrollment.get('order_uid'),
-                    json.dumps(enrollment.get('order_data')) if enrollment.get('order_data') else None,
+                    to_jsonb(enrollment.get('order_data')),
                     enrollment.get('timezone'),
                     enrollment.get('learning_progress'),
                     enrollment.get('learning_time'),
                     enrollment.get('completed_at'),
                     enrollment.get('expires_at'),
                     enrollment.get('created_at'),
-                    json.dumps(enrollment.get('user_data')) if enrollment.get('user_data') else None,
-                    json.dumps(enrollment.get('metadata')) if enrollment.get('metadata') else None,
-                    json.dumps(enrollment.get('completions')) if enrollment.get('completions') else None,
-                    json.dumps(enrollment.get('certificates')) if enrollment.get('certificates') else None,
-                    json.dumps(enrollment.get('user_groups')) if enrollment.get('user_groups') else None,
-                    json.dumps(enrollment.get('user_group_admins')) if enrollment.get('user_group_admins') else None,
-                    SOURCE_NAME,
-                    datetime.utcnow()
-                ))
+                    to_jsonb(enrollment.get('user_data')),
+                    to_jsonb(enrollment.get('metadata')),
+                    to_jsonb(enrollment.get('completions')),
+                    to_jsonb(enrollment.get('certificates')),
+                    to_jsonb(enrollment.get('user_groups')),
+                    to_jsonb(enrollment.get('user_group_admins'))
+                )
+                for enrollment in prefetch(client.iter_enrollments(), buffer_size=PREFETCH_ROWS)
+            )
+            loaded = copy_rows(cursor, staging, LOAD_COLUMNS, rows)
+            logger.info(f"Extracted {loaded} enrollments from Eduqat API")
+
+            if not loaded:
+                # Keep the previous load rather than leaving the table empty
+                logger.warning("No enrollments extracted, skipping")
+                conn.rollback()
+                return
 
+            replace_from_staging(
+                cursor, f"raw.{SOURCE_NAME}", staging, LOAD_COLUMNS,
+                constants={'data_source': SOURCE_NAME, 'extracted_at': extracted_at}
+            )
             conn.commit()
-            logger.info(f"✓ Successfully loaded {len(enrollments)} rows to raw.{SOURCE_NAME}")
+            logger.info(f"✓ Successfully loaded {loaded} rows to raw.{SOURCE_NAME}")
 
         except Exception as e:
             conn.rollback()
@@ -175,7 +139,7 @@ def ingest_eduqat_enrollments():
             raise
         finally:
             cursor.close()
-            conn.close()
+            release_db_connection(conn)
 
     except EduqatApiError as e:
         logger.error(f"Eduqat API error: {e.message} (status: {e.status_code})")
@@ -187,4 +151,5 @@ def ingest_eduqat_enrollments():
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO, stream=sys.stdout)
+    run_migrations()
     ingest_eduqat_enrollments()
\ No newline at end of file
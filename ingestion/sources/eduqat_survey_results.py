@@ -14,22 +14,46 @@ Endpoint: /manage/v2/admin/enrollments/{enrollment_id}/survey/{material_id}
 
 import os
 import sys
-import json
-from pathlib import Path
 import logging
-from datetime import datetime
-
-# Add parent directory to path for imports
-sys.path.insert(0, str(Path(__file__).parent.parent))
+from datetime import datetime, timezone
 
 from ingestion.lib.eduqat_client import EduqatClient, EduqatApiError
-from ingestion.utils.db import get_db_connection
+from ingestion.utils.db import (
+    copy_rows,
+    create_staging_table,
+    get_db_connection,
+    release_db_connection,
+    replace_from_staging,
+    run_migrations,
+    to_jsonb,
+)
+from ingestion.utils.streaming import prefetch
 
 logger = logging.getLogger(__name__)
 
 # Source configuration
 SOURCE_NAME = 'eduqat_survey_results'
 
+# Columns loaded per row; data_source and extracted_at are the same for the
+# whole load and are filled in when the staged rows are swapped in
+LOAD_COLUMNS = [
+    'enrollment_id',
+    'material_id',
+    'survey_id',
+    'course_id',
+    'user_id',
+    'survey_type',
+    'survey_title',
+    'elements',
+    'completed_at',
+]
+
+# Concurrent survey requests; matches the client's connection pool size
+SURVEY_FETCH_WORKERS = 16
+
+# Surveys requested per batch; progress is logged after each batch
+SURVEY_FETCH_BATCH = 100
+
 
 def get_survey_completions_from_db():
     """
@@ -62,7 +86,59 @@ def get_survey_completions_from_db():
         return results
     finally:
         cursor.close()
-        conn.close()
+        release_db_connection(conn)
+
+
+def _iter_survey_batches(client: EduqatClient, survey_completions: list):
+    """
+    Yield the survey completions batch by batch, each completion paired
+    with its survey results from the API.
+
+    Each batch's surveys are fetched concurrently before the batch is
+    yielded; a failed fetch is paired with its EduqatApiError.
+    """
+    for start in range(0, len(survey_completions), SURVEY_FETCH_BATCH):
+        batch = survey_completions[start:start + SURVEY_FETCH_BATCH]
+        endpoints = [
+            f'/manage/v2/admin/enrollments/{enrollment_id}/survey/{material_id}'
+            for enrollment_id, material_id, *_ in batch
+        ]
+        responses = client.get_many(endpoints, max_workers=SURVEY_FETCH_WORKERS, return_exceptions=True)
+        logger.info(f"Fetched {start + len(batch)}/{len(survey_completions)} survey results")
+        yield list(zip(batch, responses))
+
+
+def _iter_survey_rows(client: EduqatClient, survey_completions: list, failed: list):
+    """
+    Yield a load row for every survey result fetched successfully.
+
+    Completions whose fetch failed, or whose response isn't a JSON object,
+    are logged and appended to failed.
+    """
+    for batch in prefetch(_iter_survey_batches(client, survey_completions)):
+        for completion, result in batch:
+            enrollment_id, material_id, survey_id, completed_at, course_id, user_id = completion
+            if isinstance(result, EduqatApiError):
+                failed.append(completion)
+                logger.warning(f"Failed to fetch survey {material_id} for enrollment {enrollment_id}: {result.message}")
+                continue
+            if not isinstance(result, dict):
+                failed.append(completion)
+                logger.warning(f"Unexpected response for survey {material_id} for enrollment {enrollment_id}: {result!r}")
+                continue
+
+            logger.debug(f"Fetched survey results for enrollment {enrollment_id}, material {material_id}")
+            yield (
+                enrollment_id,
+                material_id,
+                survey_id or result.get('id'),
+                course_id,
+                user_id,
+                result.get('type'),
+                result.get('title'),
+                to_jsonb(result.get('elements')),
+                completed_at
+            )
 
 
 def ingest_eduqat_survey_results():
@@ -88,126 +164,45 @@ def ingest_eduqat_survey_results():
             logger.warning("No completed surveys found, skipping")
             return
 
-        # Fetch survey results from API
         client = EduqatClient()
         logger.info("Connected to Eduqat API")
 
-        survey_results = []
-        failed_count = 0
-
-        for i, (enrollment_id, material_id, survey_id, completed_at, course_id, user_id) in enumerate(survey_completions):
-            try:
-                # Fetch survey results from API
-                endpoint = f'/manage/v2/admin/enrollments/{enrollment_id}/survey/{material_id}'
-                result = client.get(endpoint)
-
-                survey_results.append({
-                    'enrollment_id': enrollment_id,
-                    'material_id': material_id,
-                    'survey_id': survey_id,
-                    'completed_at': completed_at,
-                    'course_id': course_id,
-                    'user_id': user_id,
-                    'survey_data': result
-                })
-
-                logger.debug(f"Fetched survey results for enrollment {enrollment_id}, material {material_id}")
-
-            except EduqatApiError as e:
-                failed_count += 1
-                logger.warning(f"Failed to fetch survey {material_id} for enrollment {enrollment_id}: {e.message}")
-            except Exception as e:
-                failed_count += 1
-                logger.warning(f"Unexpected error fetching survey {material_id} for enrollment {enrollment_id}: {str(e)}")
-
-            # Log progress every 25 surveys
-            if (i + 1) % 25 == 0:
-                logger.info(f"Fetched {i + 1}/{len(survey_completions)} survey results")
-
-        logger.info(f"Extracted {len(survey_results)} survey results ({failed_count} failed)")
-
-        if not survey_results:
-            logger.warning("No survey results fetched successfully, skipping")
-            return
-
         # Load to analytics database (raw schema)
         logger.info("Loading data to analytics database")
         conn = get_db_connection()
         cursor = conn.cursor()
 
         try:
-            # Create raw schema if it doesn't exist
-            cursor.execute("CREATE SCHEMA IF NOT EXISTS raw;")
-
-            # Create table
-            cursor.execute(f"""
-                CREATE TABLE IF NOT EXISTS raw.{SOURCE_NAME} (
-                    -- Composite primary key
-                    enrollment_id VARCHAR(255),
-                    material_id VARCHAR(255),
-
-                    -- Foreign keys / context
-                    survey_id VARCHAR(255),
-                    course_id INTEGER,
-                    user_id VARCHAR(255),
-
-                    -- Survey metadata
-                    survey_type VARCHAR(50),
-                    survey_title TEXT,
-
-                    -- Full survey response data as JSONB
-                    elements JSONB,
-
-                    -- Completion info
-                    completed_at TIMESTAMP,
-
-                    -- Metadata
-                    data_source VARCHAR(100),
-                    extracted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-
-                    PRIMARY KEY (enrollment_id, material_id)
-                );
-            """)
-
-            # Truncate and reload (full refresh)
-            cursor.execute(f"TRUNCATE TABLE raw.{SOURCE_NAME};")
-
-            # Insert data
-            for result in survey_results:
-                survey_data = result['survey_data']
-
-                cursor.execute(f"""
-                    INSERT INTO raw.{SOURCE_NAME} (
-                        enrollment_id,
-                        material_id,
-                        survey_id,
-                        course_id,
-                        user_id,
-                        survey_type,
-                        survey_title,
-                        elements,
-                        completed_at,
-                        data_source,
-                        extracted_at
-                    ) VALUES (
-                        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-                    );
-                """, (
-                    result['enrollment_id'],
-                    result['material_id'],
-                    result.get('survey_id') or survey_data.get('id'),
-                    result['course_id'],
-                    result['user_id'],
-                    survey_data.get('type'),
-                    survey_data.get('title'),
-                    json.dumps(survey_data.get('elements')) if survey_data.get('elements') else None,
-                    result['completed_at'],
-                    SOURCE_NAME,
-                    datetime.utcnow()
-                ))
+            # Full refresh: load into a staging table, then swap the rows
+            # into the live table at the end
+            staging = create_staging_table(cursor, f"raw.{SOURCE_NAME}")
+
+            # Stream survey results straight into batched COPYs as they are
+            # fetched, so only a few batches of responses are held in memory.
+            # The next batch is fetched in the background while earlier ones
+            # are loaded.
+            extracted_at = datetime.now(timezone.utc).replace(tzinfo=None)
+            failed = []
+            loaded = copy_rows(
+                cursor, staging, LOAD_COLUMNS,
+                _iter_survey_rows(client, survey_completions, failed)
+            )
+            logger.info(f"Extracted {loaded} survey results ({len(failed)} failed)")
+
+            if not loaded:
+                # Keep the previous load rather than leaving the table empty
+                logger.warning("No survey results fetched successfully, skipping")
+                conn.rollback()
+                return
+
+            replace_from_staging(
+                cursor, f"raw.{SOURCE_NAME}", staging, LOAD_COLUMNS,
+                constants={'data_source': SOURCE_NAME, 'extracted_at': extracted_at},
+                rebuild_keys=True
+            )
 
             conn.commit()
-            logger.info(f"Successfully loaded {len(survey_results)} rows to raw.{SOURCE_NAME}")
+            logger.info(f"Successfully loaded {loaded} rows to raw.{SOURCE_NAME}")
 
         except Exception as e:
             conn.rollback()
@@ -215,7 +210,7 @@ def ingest_eduqat_survey_results():
             raise
         finally:
             cursor.close()
-            conn.close()
+            release_db_connection(conn)
 
     except EduqatApiError as e:
         logger.error(f"Eduqat API error: {e.message} (status: {e.status_code})")
@@ -227,4 +222,5 @@ def ingest_eduqat_survey_results():
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO, stream=sys.stdout)
+    run_migrations()
     ingest_eduqat_survey_results()
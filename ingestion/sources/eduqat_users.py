@@ -6,22 +6,51 @@ This script pulls user data from the Eduqat public API.
 
 import os
 import sys
-import json
-from pathlib import Path
 import logging
-from datetime import datetime
-
-# Add parent directory to path for imports
-sys.path.insert(0, str(Path(__file__).parent.parent))
+from datetime import datetime, timezone
 
 from ingestion.lib.eduqat_client import EduqatClient, EduqatApiError
-from ingestion.utils.db import get_db_connection
+from ingestion.utils.db import (
+    copy_rows,
+    create_staging_table,
+    get_db_connection,
+    release_db_connection,
+    replace_from_staging,
+    run_migrations,
+    to_jsonb,
+)
 
 logger = logging.getLogger(__name__)
 
 # Source configuration
 SOURCE_NAME = 'eduqat_users'
 
+# Columns loaded per row; data_source and extracted_at are the same for the
+# whole load and are filled in when the staged rows are swapped in
+LOAD_COLUMNS = [
+    'id',
+    'user_id',
+    'subid',
+    'user_name',
+    'name',
+    'email',
+    'phone_number',
+    'phone_country',
+    'phone_country_calling_code',
+    'description',
+    'avatar_url',
+    'role',
+    'status',
+    'total_course',
+    'total_enrollment',
+    'stripe_customer_ids',
+    'metadata',
+    'pre_signup_at',
+    'confirmed_at',
+    'last_loggin_at',
+    'created_at',
+]
+
 
 def ingest_eduqat_users():
     """
@@ -58,75 +87,14 @@ def ingest_eduqat_users():
         cursor = conn.cursor()
 
         try:
-            # Create raw schema if it doesn't exist
-            cursor.execute("CREATE SCHEMA IF NOT EXISTS raw;")
-
-            # Create table
-            cursor.execute(f"""
-                CREATE TABLE IF NOT EXISTS raw.{SOURCE_NAME} (
-                    id INTEGER PRIMARY KEY,
-                    user_id INTEGER,
-                    subid VARCHAR(255),
-                    user_name VARCHAR(255),
-                    name VARCHAR(255),
-                    email VARCHAR(255),
-                    phone_number VARCHAR(50),
-                    phone_country VARCHAR(50),
-                    phone_country_calling_code VARCHAR(10),
-                    description TEXT,
-                    avatar_url TEXT,
-                    role VARCHAR(50),
-                    status VARCHAR(50),
-                    total_course INTEGER,
-                    total_enrollment INTEGER,
-                    stripe_customer_ids JSONB,
-                    metadata JSONB,
-                    pre_signup_at TIMESTAMP,
-                    confirmed_at TIMESTAMP,
-                    last_loggin_at TIMESTAMP,
-                    created_at TIMESTAMP,
-                    -- Ingestion metadata
-                    data_source VARCHAR(100),
-                    extracted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                );
-            """)
-
-            # Truncate and reload (full refresh)
-            cursor.execute(f"TRUNCATE TABLE raw.{SOURCE_NAME};")
-
-            # Insert data
-            for user in users:
-                cursor.execute(f"""
-                    INSERT INTO raw.{SOURCE_NAME} (
-                        id,
-                        user_id,
-                        subid,
-                        user_name,
-                        name,
-                        email,
-                        phone_number,
-                        phone_country,
-                        phone_country_calling_code,
-                        description,
-                        avatar_url,
-                        role,
-                        status,
-                        total_course,
-                        total_enrollment,
-                        stripe_customer_ids,
-                        metadata,
-                        pre_signup_at,
-                        confirmed_at,
-                        last_loggin_at,
-                        created_at,
-                        data_source,
-                        extracted_at
-                    ) VALUES (
-                        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-                        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-                        %s, %s, %s
-                    );
-                """, (
+            # Full refresh: load into a staging table, then swap the rows
+            # into the live table at the end
+            staging = create_staging_table(cursor, f"raw.{SOURCE_NAME}")
+
+            # Bulk load with COPY
+            extracted_at = datetime.now(timezone.utc).replace(tzinfo=None)
+            rows = [
+                (
                     user.get('id'),
                     user.get('user_id'),
                     user.get('subid'),
@@ -142,15 +110,21 @@ def ingest_eduqat_users():
                     user.get('status'),
                     user.get('total_course'),
                     user.get('total_enrollment'),
-                    json.dumps(user.get('stripe_customer_ids')) if user.get('stripe_customer_ids') else None,
-                    json.dumps(user.get('metadata')) if user.get('metadata') else None,
+                    to_jsonb(user.get('stripe_customer_ids')),
+                    to_jsonb(user.get('metadata')),
                     user.get('pre_signup_at'),
                     user.get('confirmed_at'),
                     user.get('last_loggin_at'),
-                    user.get('created_at'),
-                    SOURCE_NAME,
-                    datetime.utcnow()
-                ))
+                    user.get('created_at')
+                )
+                for user in users
+            ]
+            copy_rows(cursor, staging, LOAD_COLUMNS, rows)
+            replace_from_staging(
+                cursor, f"raw.{SOURCE_NAME}", staging, LOAD_COLUMNS,
+                constants={'data_source': SOURCE_NAME, 'extracted_at': extracted_at},
+                rebuild_keys=True
+            )
 
             conn.commit()
             logger.info(f"✓ Successfully loaded {len(users)} rows to raw.{SOURCE_NAME}")
@@ -161,7 +135,7 @@ def ingest_eduqat_users():
             raise
         finally:
             cursor.close()
-            conn.close()
+            release_db_connection(conn)
 
     except EduqatApiError as e:
         logger.error(f"Eduqat API error: {e.message} (status: {e.status_code})")
@@ -173,4 +147,5 @@ def ingest_eduqat_users():
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO, stream=sys.stdout)
+    run_migrations()
     ingest_eduqat_users()
\ No newline at end of file
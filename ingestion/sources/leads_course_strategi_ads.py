@@ -3,17 +3,19 @@ Ingest leads data from Course Strategy Ads Google Sheets.
 """
 
 import os
-import sys
-from pathlib import Path
 import logging
-from datetime import datetime
+from datetime import datetime, timezone
 import pandas as pd
 
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
 from ingestion.lib.gsheets_client import GSheetsClient
 from ingestion.lib.column_mappings import apply_column_mapping
-from ingestion.utils.db import get_db_connection
+from ingestion.utils.db import (
+    copy_dataframe,
+    create_staging_table,
+    get_db_connection,
+    release_db_connection,
+    replace_from_staging,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -48,7 +50,7 @@ def ingest_leads_course_strategi_ads():
 
         df = apply_column_mapping(df)
         df['data_source'] = SOURCE_NAME
-        df['extracted_at'] = datetime.utcnow()
+        df['extracted_at'] = datetime.now(timezone.utc).replace(tzinfo=None)
 
         # Rename 'id' column if it exists to avoid conflict with SERIAL PRIMARY KEY
         if 'id' in df.columns:
@@ -71,13 +73,11 @@ def ingest_leads_course_strategi_ads():
                 );
             """)
 
-            cursor.execute(f"TRUNCATE TABLE raw.{SOURCE_NAME} CASCADE;")
-
-            for _, row in df.iterrows():
-                col_names = ', '.join([f'"{col}"' for col in columns])
-                placeholders = ', '.join(['%s'] * len(columns))
-                values = [row.get(col) for col in columns]
-                cursor.execute(f"INSERT INTO raw.{SOURCE_NAME} ({col_names}) VALUES ({placeholders});", values)
+            # Bulk load with COPY into a staging table, then swap the rows
+            # into the live table
+            staging = create_staging_table(cursor, f"raw.{SOURCE_NAME}")
+            copy_dataframe(cursor, staging, df)
+            replace_from_staging(cursor, f"raw.{SOURCE_NAME}", staging, columns, cascade=True)
 
             conn.commit()
             logger.info(f"✓ Successfully loaded {len(df)} rows to raw.{SOURCE_NAME}")
@@ -87,7 +87,7 @@ def ingest_leads_course_strategi_ads():
             raise
         finally:
             cursor.close()
-            conn.close()
+            release_db_connection(conn)
 
     except Exception as e:
         logger.error(f"Error ingesting {SOURCE_NAME}: {str(e)}")
@@ -5,17 +5,20 @@ This script pulls customer purchase data from the product database.
 """
 
 import os
-import sys
-from pathlib import Path
 import logging
-from datetime import datetime
-
-# Add parent directory to path for imports
-sys.path.insert(0, str(Path(__file__).parent.parent))
+from datetime import datetime, timezone
 
 from ingestion.lib.postgres_client import PostgresClient
 from ingestion.lib.column_mappings import apply_column_mapping
-from ingestion.utils.db import get_db_connection
+from ingestion.utils.db import (
+    copy_dataframe,
+    create_staging_table,
+    get_db_connection,
+    release_db_connection,
+    replace_from_staging,
+    run_migrations,
+    strip_timezones,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +26,21 @@ logger = logging.getLogger(__name__)
 SOURCE_NAME = 'purchase_form_data'
 SOURCE_DB_URL = os.getenv('PRODUCT_DB_URL')
 
+# Columns loaded per row; data_source and extracted_at are the same for the
+# whole load and are filled in when the staged rows are swapped in
+LOAD_COLUMNS = [
+    'customer_name',
+    'email',
+    'phone_number',
+    'created_at',
+    'paid_at',
+    'product_type',
+    'course_id',
+    'amount',
+    'payment_method',
+    'payment_channel',
+]
+
 
 def ingest_purchase_data():
     """
@@ -65,31 +83,10 @@ def ingest_purchase_data():
             # Apply column mapping
             df = apply_column_mapping(df)
 
-            # Add metadata
-            df['data_source'] = SOURCE_NAME
-            df['extracted_at'] = datetime.utcnow()
-
-            # Convert DataFrame to list of dicts with Python native types
-            # This handles NaT -> None conversion properly
-            import pandas as pd
-            import numpy as np
-
-            def convert_value(val):
-                """Convert pandas/numpy types to Python native types."""
-                if pd.isna(val):
-                    return None
-                if isinstance(val, (pd.Timestamp, np.datetime64)):
-                    return pd.Timestamp(val).to_pydatetime()
-                if isinstance(val, np.integer):
-                    return int(val)
-                if isinstance(val, np.floating):
-                    return float(val)
-                return val
-
-            records = df.to_dict('records')
-            for record in records:
-                for key, val in record.items():
-                    record[key] = convert_value(val)
+            extracted_at = datetime.now(timezone.utc).replace(tzinfo=None)
+
+            # Raw table column order
+            df = strip_timezones(df.reindex(columns=LOAD_COLUMNS))
 
             # Load to analytics database (raw schema)
             logger.info("Loading data to analytics database")
@@ -97,61 +94,14 @@ def ingest_purchase_data():
             cursor = conn.cursor()
 
             try:
-                # Create raw schema if it doesn't exist
-                cursor.execute("CREATE SCHEMA IF NOT EXISTS raw;")
-
-                # Create table
-                cursor.execute(f"""
-                    CREATE TABLE IF NOT EXISTS raw.{SOURCE_NAME} (
-                        customer_name VARCHAR(255),
-                        email VARCHAR(255),
-                        phone_number VARCHAR(50),
-                        created_at TIMESTAMP,
-                        paid_at TIMESTAMP,
-                        product_type VARCHAR(100),
-                        course_id VARCHAR(255),
-                        amount NUMERIC,
-                        payment_method VARCHAR(100),
-                        payment_channel VARCHAR(100),
-                        data_source VARCHAR(100),
-                        extracted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    );
-                """)
-
-                # Truncate and reload (full refresh)
-                cursor.execute(f"TRUNCATE TABLE raw.{SOURCE_NAME};")
-
-                # Insert data
-                for row in records:
-                    cursor.execute(f"""
-                        INSERT INTO raw.{SOURCE_NAME} (
-                            customer_name,
-                            email,
-                            phone_number,
-                            created_at,
-                            paid_at,
-                            product_type,
-                            course_id,
-                            amount,
-                            payment_method,
-                            payment_channel,
-                            data_source,
-                            extracted_at
-                        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s);
-                    """, (
-                        row.get('customer_name'),
-                        row.get('email'),
-                        row.get('phone_number'),
-                        row.get('created_at'),
-                        row.get('paid_at'),
-                        row.get('product_type'),
-                        row.get('course_id'),
-                        row.get('amount'),
-                        row.get('payment_method'),
-                        row.get('payment_channel'),
-                        row.get('data_source'),
-                        row.get('extracted_at')
-                    ))
+                # Full refresh: bulk load into a staging table with COPY,
+                # then swap the rows into the live table
+                staging = create_staging_table(cursor, f"raw.{SOURCE_NAME}")
+                copy_dataframe(cursor, staging, df)
+                replace_from_staging(
+                    cursor, f"raw.{SOURCE_NAME}", staging, LOAD_COLUMNS,
+                    constants={'data_source': SOURCE_NAME, 'extracted_at': extracted_at}
+                )
 
                 conn.commit()
                 logger.info(f"✓ Successfully loaded {len(df)} rows to raw.{SOURCE_NAME}")
@@ -162,7 +112,7 @@ def ingest_purchase_data():
                 raise
             finally:
                 cursor.close()
-                conn.close()
+                release_db_connection(conn)
 
     except Exception as e:
         logger.error(f"Error ingesting {SOURCE_NAME}: {str(e)}")
@@ -170,4 +120,5 @@ def ingest_purchase_data():
 
 
 if __name__ == "__main__":
+    run_migrations()
     ingest_purchase_data()
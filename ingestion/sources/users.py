@@ -5,17 +5,21 @@ This script pulls user account data from the product database.
 """
 
 import os
-import sys
-from pathlib import Path
 import logging
-from datetime import datetime
-
-# Add parent directory to path for imports
-sys.path.insert(0, str(Path(__file__).parent.parent))
+from datetime import datetime, timezone
+import json
 
 from ingestion.lib.postgres_client import PostgresClient
 from ingestion.lib.column_mappings import apply_column_mapping
-from ingestion.utils.db import get_db_connection
+from ingestion.utils.db import (
+    copy_dataframe,
+    create_staging_table,
+    get_db_connection,
+    release_db_connection,
+    replace_from_staging,
+    run_migrations,
+    strip_timezones,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +27,36 @@ logger = logging.getLogger(__name__)
 SOURCE_NAME = 'users'
 SOURCE_DB_URL = os.getenv('PRODUCT_DB_URL')
 
+# Columns loaded per row; data_source and extracted_at are the same for the
+# whole load and are filled in when the staged rows are swapped in
+LOAD_COLUMNS = [
+    'id',
+    'email',
+    'created_at',
+    'updated_at',
+    'role',
+    'eduqat_user_id',
+    'name',
+    'mobile',
+    'mobile_verified',
+    'mobile_verified_at',
+    'avatar_url',
+    'birth_date',
+    'address',
+    'city',
+    'province',
+    'postal_code',
+    'language_preference',
+    'ai_tone_preference',
+    'interests',
+    'level',
+    'voice_preference',
+    'latitude',
+    'longitude',
+    'segment',
+    'business_name',
+]
+
 
 def ingest_users():
     """
@@ -80,40 +114,15 @@ def ingest_users():
             # Apply column mapping
             df = apply_column_mapping(df)
 
-            # Add metadata
-            df['data_source'] = SOURCE_NAME
-            df['extracted_at'] = datetime.utcnow()
-
-            # Convert DataFrame to list of dicts with Python native types
-            import pandas as pd
-            import numpy as np
-
-            def convert_value(val):
-                """Convert pandas/numpy types to Python native types."""
-                if isinstance(val, (list, dict)):
-                    return val
-                if pd.isna(val):
-                    return None
-                if isinstance(val, (pd.Timestamp, np.datetime64)):
-                    return pd.Timestamp(val).to_pydatetime()
-                if isinstance(val, np.integer):
-                    return int(val)
-                if isinstance(val, np.floating):
-                    return float(val)
-                if isinstance(val, np.bool_):
-                    return bool(val)
-                return val
-
-            records = df.to_dict('records')
-            for record in records:
-                for key, val in record.items():
-                    record[key] = convert_value(val)
-
-            # Serialize interests (list/dict) to JSON string for JSONB column
-            import json
-            for record in records:
-                if record.get('interests') is not None:
-                    record['interests'] = json.dumps(record['interests'])
+            extracted_at = datetime.now(timezone.utc).replace(tzinfo=None)
+
+            # Raw table column order
+            df = strip_timezones(df.reindex(columns=LOAD_COLUMNS))
+
+            # Serialize interests to JSON string for JSONB column
+            df['interests'] = df['interests'].map(
+                lambda val: json.dumps(val) if val is not None else None
+            )
 
             # Load to analytics database (raw schema)
             logger.info("Loading data to analytics database")
@@ -121,106 +130,14 @@ def ingest_users():
             cursor = conn.cursor()
 
             try:
-                # Create raw schema if it doesn't exist
-                cursor.execute("CREATE SCHEMA IF NOT EXISTS raw;")
-
-                # Create table if it doesn't exist
-                cursor.execute(f"""
-                    CREATE TABLE IF NOT EXISTS raw.{SOURCE_NAME} (
-                        id TEXT,
-                        email VARCHAR(255),
-                        created_at TIMESTAMP,
-                        updated_at TIMESTAMP,
-                        role VARCHAR(50),
-                        eduqat_user_id VARCHAR(255),
-                        name VARCHAR(255),
-                        mobile VARCHAR(50),
-                        mobile_verified BOOLEAN,
-                        mobile_verified_at TIMESTAMP,
-                        avatar_url TEXT,
-                        birth_date DATE,
-                        address TEXT,
-                        city VARCHAR(255),
-                        province VARCHAR(255),
-                        postal_code VARCHAR(20),
-                        language_preference VARCHAR(10),
-                        ai_tone_preference VARCHAR(50),
-                        interests JSONB,
-                        level VARCHAR(50),
-                        voice_preference VARCHAR(50),
-                        latitude DOUBLE PRECISION,
-                        longitude DOUBLE PRECISION,
-                        segment VARCHAR(100),
-                        business_name VARCHAR(255),
-                        data_source VARCHAR(100),
-                        extracted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    );
-                """)
-
-                # Truncate and reload (full refresh)
-                cursor.execute(f"TRUNCATE TABLE raw.{SOURCE_NAME};")
-
-                # Insert data
-                for row in records:
-                    cursor.execute(f"""
-                        INSERT INTO raw.{SOURCE_NAME} (
-                            id,
-                            email,
-                            created_at,
-                            updated_at,
-                            role,
-                            eduqat_user_id,
-                            name,
-                            mobile,
-                            mobile_verified,
-                            mobile_verified_at,
-                            avatar_url,
-                            birth_date,
-                            address,
-                            city,
-                            province,
-                            postal_code,
-                            language_preference,
-                            ai_tone_preference,
-                            interests,
-                            level,
-                            voice_preference,
-                            latitude,
-                            longitude,
-                            segment,
-                            business_name,
-                            data_source,
-                            extracted_at
-                        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s);
-                    """, (
-                        row.get('id'),
-                        row.get('email'),
-                        row.get('created_at'),
-                        row.get('updated_at'),
-                        row.get('role'),
-                        row.get('eduqat_user_id'),
-                        row.get('name'),
-                        row.get('mobile'),
-                        row.get('mobile_verified'),
-                        row.get('mobile_verified_at'),
-                        row.get('avatar_url'),
-                        row.get('birth_date'),
-                        row.get('address'),
-                        row.get('city'),
-                        row.get('province'),
-                        row.get('postal_code'),
-                        row.get('language_preference'),
-                        row.get('ai_tone_preference'),
-                        row.get('interests'),
-                        row.get('level'),
-                        row.get('voice_preference'),
-                        row.get('latitude'),
-                        row.get('longitude'),
-                        row.get('segment'),
-                        row.get('business_name'),
-                        row.get('data_source'),
-                        row.get('extracted_at')
-                    ))
+                # Full refresh: bulk load into a staging table with COPY,
+                # then swap the rows into the live table
+                staging = create_staging_table(cursor, f"raw.{SOURCE_NAME}")
+                copy_dataframe(cursor, staging, df)
+                replace_from_staging(
+                    cursor, f"raw.{SOURCE_NAME}", staging, LOAD_COLUMNS,
+                    constants={'data_source': SOURCE_NAME, 'extracted_at': extracted_at}
+                )
 
                 conn.commit()
                 logger.info(f"✓ Successfully loaded {len(df)} rows to raw.{SOURCE_NAME}")
@@ -231,7 +148,7 @@ def ingest_users():
                 raise
             finally:
                 cursor.close()
-                conn.close()
+                release_db_connection(conn)
 
     except Exception as e:
         logger.error(f"Error ingesting {SOURCE_NAME}: {str(e)}")
@@ -239,4 +156,5 @@ def ingest_users():
 
 
 if __name__ == "__main__":
+    run_migrations()
     ingest_users()
@@ -2,6 +2,28 @@
 Utility modules for data ingestion.
 """
 
-from .db import get_db_connection, execute_query
+from .db import (
+    get_db_connection,
+    release_db_connection,
+    execute_query,
+    run_migrations,
+    to_jsonb,
+    copy_dataframe,
+    strip_timezones,
+    create_staging_table,
+    replace_from_staging,
+)
+from .streaming import prefetch
 
-__all__ = ["get_db_connection", "execute_query"]
+__all__ = [
+    "get_db_connection",
+    "release_db_connection",
+    "execute_query",
+    "run_migrations",
+    "to_jsonb",
+    "copy_dataframe",
+    "strip_timezones",
+    "create_staging_table",
+    "replace_from_staging",
+    "prefetch",
+]
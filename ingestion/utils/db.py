@@ -2,31 +2,310 @@
 Database connection utilities.
 """
 
+import io
+import json
 import os
-import psycopg2
+import threading
+from pathlib import Path
+from psycopg2.extras import Json
+from psycopg2.pool import ThreadedConnectionPool
 from dotenv import load_dotenv
 
+try:
+    import orjson
+except ImportError:  # speedup only; fall back to the stdlib json
+    orjson = None
+
 # Load environment variables
 load_dotenv()
 
+# Idempotent SQL files creating the raw tables, applied in file name order
+MIGRATIONS_DIR = Path(__file__).parent.parent / 'migrations'
+
+
+# Connections shared by every source in the process; created on first use
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    """Return the process-wide connection pool, creating it if needed."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # getconn() raises PoolError instead of waiting when the pool is
+            # exhausted, so leave room for every concurrent ingestion worker
+            max_size = max(
+                int(os.getenv("POSTGRES_POOL_MAX", 10)),
+                int(os.getenv("INGESTION_MAX_WORKERS", 5)),
+            )
+            # minconn == maxconn: the pool only keeps minconn returned
+            # connections, so anything lower would close the rest on release
+            _pool = ThreadedConnectionPool(
+                max_size,
+                max_size,
+                host=os.getenv("POSTGRES_HOST", "localhost"),
+                port=int(os.getenv("POSTGRES_PORT", 5432)),
+                user=os.getenv("POSTGRES_USER", "postgres"),
+                password=os.getenv("POSTGRES_PASSWORD"),
+                database=os.getenv("POSTGRES_DB", "analytics")
+            )
+        return _pool
+
 
 def get_db_connection():
     """
-    Create and return a PostgreSQL database connection.
+    Take a PostgreSQL database connection from the shared pool.
+
+    Hand it back with release_db_connection instead of closing it, so the
+    next caller reuses it rather than connecting again.
     """
     try:
-        conn = psycopg2.connect(
-            host=os.getenv("POSTGRES_HOST", "localhost"),
-            port=int(os.getenv("POSTGRES_PORT", 5432)),
-            user=os.getenv("POSTGRES_USER", "postgres"),
-            password=os.getenv("POSTGRES_PASSWORD"),
-            database=os.getenv("POSTGRES_DB", "analytics")
-        )
-        return conn
+        return _get_pool().getconn()
     except Exception as e:
         raise Exception(f"Failed to connect to database: {str(e)}")
 
 
+def release_db_connection(conn):
+    """
+    Return a connection from get_db_connection to the pool.
+
+    An open transaction is rolled back first; a closed connection is
+    discarded.
+    """
+    _get_pool().putconn(conn, close=bool(conn.closed))
+
+
+def run_migrations():
+    """
+    Apply every SQL file in ingestion/migrations, in file name order.
+
+    The migrations are idempotent (CREATE ... IF NOT EXISTS and guarded
+    ALTERs), so they are simply all run, in one transaction, before the
+    sources load. The sources themselves then run no DDL on their tables.
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    try:
+        for path in sorted(MIGRATIONS_DIR.glob('*.sql')):
+            cursor.execute(path.read_text())
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        raise e
+    finally:
+        cursor.close()
+        release_db_connection(conn)
+
+
+def _dumps(obj) -> str:
+    """Encode a value to a JSON string, using orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode('utf-8')
+    return json.dumps(obj)
+
+
+def to_jsonb(value):
+    """
+    Wrap a nested value for a JSON/JSONB query parameter.
+
+    Encoding happens when psycopg2 adapts the parameter. Empty values
+    (None, {}, [], '') become NULL.
+
+    Args:
+        value: Any JSON-serializable value
+
+    Returns:
+        A psycopg2 Json adapter, or None for empty values
+    """
+    return Json(value, dumps=_dumps) if value else None
+
+
+# Characters that force a CSV field to be quoted
+_CSV_SPECIAL = (',', '"', '\n', '\r')
+
+
+def _copy_value(value):
+    """Render one value as a CSV field for copy_rows."""
+    if value is None:
+        return '\\N'
+    if isinstance(value, Json):
+        text = value.dumps(value.adapted)
+    elif isinstance(value, float) and value.is_integer():
+        # JSON numbers arrive as floats; 60.0 wouldn't parse as an integer
+        text = str(int(value))
+    else:
+        text = str(value)
+    # Quote anything CSV needs quoted, and a literal \N so it isn't NULL
+    if text == '\\N' or any(char in text for char in _CSV_SPECIAL):
+        return '"' + text.replace('"', '""') + '"'
+    return text
+
+
+def copy_rows(cursor, table, columns, rows, batch_size=5000):
+    """
+    Bulk load rows into a table with COPY FROM STDIN.
+
+    rows may be any iterable, including a generator; it is written as CSV
+    and sent batch_size rows per COPY, so it's never materialized in full.
+    None is sent as NULL and to_jsonb values as their JSON text. Floats
+    with no fractional part are sent as integers (60.0 as 60), so they
+    load into INTEGER columns. Any other value is sent as its str(), which
+    must be in a form Postgres can parse from text (e.g. ISO timestamp
+    strings); it is quoted when needed, so a literal '\\N' string stays a
+    string rather than NULL.
+
+    Args:
+        cursor: psycopg2 cursor to run the COPY on
+        table (str): Table name, e.g. 'raw.eduqat_courses'
+        columns (list): Column names, in the same order as each row's values
+        rows (iterable): Tuples of values
+        batch_size (int): Rows per COPY
+
+    Returns:
+        int: Number of rows loaded
+    """
+    column_list = ', '.join(f'"{col}"' for col in columns)
+    query = f"""
+        COPY {table} ({column_list})
+        FROM STDIN WITH (FORMAT csv, NULL '\\N')
+    """
+
+    loaded = 0
+    csv_buffer = io.StringIO()
+    for row in rows:
+        csv_buffer.write(','.join(_copy_value(value) for value in row) + '\n')
+        loaded += 1
+        if loaded % batch_size == 0:
+            csv_buffer.seek(0)
+            cursor.copy_expert(query, csv_buffer)
+            csv_buffer.seek(0)
+            csv_buffer.truncate()
+
+    if csv_buffer.tell():
+        csv_buffer.seek(0)
+        cursor.copy_expert(query, csv_buffer)
+
+    return loaded
+
+
+def copy_dataframe(cursor, table, df):
+    """
+    Bulk load a DataFrame into a table with COPY FROM STDIN.
+
+    Columns are matched to the table by name. Missing values are sent as
+    NULL (\\N), which keeps them distinct from empty strings.
+
+    Args:
+        cursor: psycopg2 cursor to run the COPY on
+        table (str): Table name, e.g. 'raw.branding_level_up'
+        df (pd.DataFrame): Rows to load; values must already be in a form
+            Postgres can parse from CSV text
+    """
+    csv_buffer = io.StringIO()
+    df.to_csv(csv_buffer, index=False, header=False, na_rep='\\N')
+    csv_buffer.seek(0)
+
+    column_list = ', '.join(f'"{col}"' for col in df.columns)
+    cursor.copy_expert(f"""
+        COPY {table} ({column_list})
+        FROM STDIN WITH (FORMAT csv, NULL '\\N')
+    """, csv_buffer)
+
+
+def strip_timezones(df):
+    """
+    Convert a DataFrame's timezone-aware datetime columns to naive UTC.
+
+    The raw tables use plain TIMESTAMP columns, which ignore the offset in
+    the text copy_dataframe sends, so aware values are normalized first.
+
+    Args:
+        df (pd.DataFrame): Frame to convert in place
+
+    Returns:
+        pd.DataFrame: The same frame
+    """
+    for col in df.select_dtypes(include=['datetimetz']).columns:
+        df[col] = df[col].dt.tz_convert('UTC').dt.tz_localize(None)
+    return df
+
+
+def create_staging_table(cursor, table):
+    """
+    Create an empty temp table shaped like table, to load into before
+    replace_from_staging swaps the rows in.
+
+    Loading into the staging table takes no lock on table, so readers of
+    the live table aren't blocked while rows are fetched and loaded. Like
+    an UNLOGGED table, a temp table writes no WAL, so the bulk load itself
+    skips WAL entirely. The staging table is dropped when the transaction
+    ends.
+
+    Args:
+        cursor: psycopg2 cursor to run the DDL on
+        table (str): Schema-qualified table name, e.g. 'raw.eduqat_courses'
+
+    Returns:
+        str: Name of the staging table
+    """
+    staging = f"{table.split('.')[-1]}_staging"
+    cursor.execute(f"""
+        CREATE TEMP TABLE {staging}
+        (LIKE {table} INCLUDING DEFAULTS)
+        ON COMMIT DROP;
+    """)
+    return staging
+
+
+def replace_from_staging(cursor, table, staging, columns, cascade=False, constants=None, rebuild_keys=False):
+    """
+    Replace every row of table with the rows of a staging table.
+
+    Runs as a TRUNCATE plus a server-side INSERT ... SELECT, so the
+    exclusive lock TRUNCATE takes is only held for that copy (until the
+    caller commits), not for the whole fetch and load. Dropping and
+    renaming the table instead would break the dbt views built on it.
+
+    Args:
+        cursor: psycopg2 cursor, in the transaction that loaded staging
+        table (str): Schema-qualified table name to replace
+        staging (str): Staging table name from create_staging_table
+        columns (list): Columns to copy across
+        cascade (bool): Truncate with CASCADE
+        constants (dict): Extra columns with the same value on every row
+            (e.g. data_source), filled in here instead of being sent with
+            each staged row
+        rebuild_keys (bool): Drop table's primary key and unique
+            constraints for the INSERT and add them back afterwards, so
+            their indexes are built in one pass instead of row by row
+    """
+    constants = constants or {}
+    column_list = ', '.join(f'"{col}"' for col in [*columns, *constants])
+    select_list = ', '.join([*(f'"{col}"' for col in columns), *(['%s'] * len(constants))])
+    cursor.execute(f"TRUNCATE TABLE {table}{' CASCADE' if cascade else ''};")
+
+    keys = []
+    if rebuild_keys:
+        cursor.execute("""
+            SELECT conname, pg_get_constraintdef(oid)
+            FROM pg_constraint
+            WHERE conrelid = %s::regclass AND contype IN ('p', 'u');
+        """, (table,))
+        keys = cursor.fetchall()
+        for name, _ in keys:
+            cursor.execute(f'ALTER TABLE {table} DROP CONSTRAINT "{name}";')
+
+    cursor.execute(f"""
+        INSERT INTO {table} ({column_list})
+        SELECT {select_list} FROM {staging};
+    """, tuple(constants.values()) or None)
+
+    for name, definition in keys:
+        cursor.execute(f'ALTER TABLE {table} ADD CONSTRAINT "{name}" {definition};')
+
+
 def execute_query(query, params=None, fetch=False):
     """
     Execute a SQL query and optionally fetch results.
@@ -55,4 +334,4 @@ def execute_query(query, params=None, fetch=False):
         raise e
     finally:
         cursor.close()
-        conn.close()
+        release_db_connection(conn)
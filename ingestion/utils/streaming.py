@@ -0,0 +1,66 @@
+"""
+Streaming utilities.
+"""
+
+import queue
+import threading
+
+# Marks the end of the producer's items in the queue
+_DONE = object()
+
+
+def prefetch(iterable, buffer_size=2):
+    """
+    Iterate over iterable on a background thread, keeping items ready ahead
+    of the consumer.
+
+    Lets a slow producer (e.g. paging an API) run while the consumer works
+    on earlier items (e.g. inserting them), so the total time is closer to
+    the slower of the two than to their sum. An exception raised by the
+    producer is re-raised to the consumer.
+
+    Args:
+        iterable: Items to produce; iterated on the background thread
+        buffer_size (int): Maximum number of items produced ahead
+
+    Yields:
+        The items of iterable, in order
+    """
+    items = queue.Queue(maxsize=buffer_size)
+    stopped = threading.Event()
+
+    def put(entry):
+        # Give up once the consumer has stopped, instead of blocking forever
+        while not stopped.is_set():
+            try:
+                items.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put((item, None)):
+                    return
+        except BaseException as e:
+            # Includes SystemExit and the like, so the consumer always wakes
+            put((_DONE, e))
+        else:
+            put((_DONE, None))
+
+    producer = threading.Thread(target=produce, name='prefetch', daemon=True)
+    producer.start()
+
+    try:
+        while True:
+            item, error = items.get()
+            if item is _DONE:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stopped.set()
+        producer.join()